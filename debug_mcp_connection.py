@@ -8,6 +8,8 @@ import json
 import subprocess
 import sys
 import os
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 def check_python_environment():
@@ -223,8 +225,37 @@ async def test_mcp_client():
         print(f"❌ MCP client test failed: {e}")
         return False
 
+def check_running_server(base_url):
+    """Check an HTTP server that is already running through its /ready endpoint"""
+    print(f"\n🩺 Checking Running Server at {base_url}")
+    print("=" * 50)
+    
+    try:
+        with urllib.request.urlopen(f"{base_url.rstrip('/')}/ready", timeout=5) as response:
+            readiness = json.load(response)
+    except urllib.error.HTTPError as e:
+        # 503 still carries the report: the server is draining or a required backend is down
+        readiness = json.load(e)
+    except Exception as e:
+        print(f"❌ Server not reachable: {e}")
+        return False
+    
+    print(f"{'✅' if readiness['ready'] else '❌'} Ready: {readiness['ready']}"
+          f"{' (draining for shutdown)' if readiness['draining'] else ''}")
+    for name, backend in readiness["backends"].items():
+        icon = {"up": "✅", "down": "❌", "unknown": "⏳"}.get(backend["status"], "➖")
+        detail = backend.get("error") or (f"{backend['latency_ms']} ms, checked {backend['checked_seconds_ago']}s ago"
+                                          if backend.get("latency_ms") is not None else "")
+        print(f"{icon} {name}: {backend['status']} {detail}".rstrip())
+    return readiness["ready"]
+
 def main():
     """Main debugging function"""
+    if len(sys.argv) > 1:
+        # e.g. python debug_mcp_connection.py http://127.0.0.1:8000
+        check_running_server(sys.argv[1])
+        return
+    
     print("🐛 MCP Server Debug Tool")
     print("=" * 50)
     
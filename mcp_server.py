@@ -1,17 +1,50 @@
 from mcp.server import FastMCP
+from mcp.server.fastmcp import Context
+from starlette.responses import JSONResponse
 from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request as GoogleAuthRequest
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.http import MediaIoBaseDownload, HttpRequest
+import google_auth_httplib2
+import httplib2
+from googleapiclient.errors import HttpError
 import google.generativeai as genai
-from github import Github 
+import requests
+from google.api_core import exceptions as google_exceptions
+from github import Github, Auth, GithubException, UnknownObjectException
+from github.Requester import Requester, HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+from urllib3.util.retry import Retry
 import io
 import json
+import argparse
 from dotenv import load_dotenv
 import os
 import logging
 from typing import Optional
 import base64
 import re
+import signal
+import sqlite3
+import sys
+import threading
+import anyio
+import contextvars
+import inspect
+import time
+import datetime
+import weakref
+import copy
+import functools
+import hashlib
+import heapq
+import math
+import multiprocessing
+import random
+from collections import deque, OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -31,17 +64,204 @@ GOOGLE_SCOPES = [
     "https://www.googleapis.com/auth/drive.file"       # File creation access
 ]
 
+# Refresh OAuth access tokens this long before they expire, so no tool call waits for a refresh
+GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS", "600"))
+GOOGLE_TOKEN_RETRY_SECONDS = 15.0
+
+class SerializedCredentials(Credentials):
+    """OAuth user credentials that refresh one caller at a time.
+
+    Callers that find the token expired together wait for a single refresh instead
+    of each sending their own. With `token_file` set, every refreshed token is
+    written back to it atomically.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.token_file = None
+        self.refreshes = 0
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, request):
+        stale_token = self.token
+        with self._refresh_lock:
+            if self.token != stale_token and self.valid:
+                return  # Refreshed by another thread while this one waited
+            super().refresh(request)
+            self.refreshes += 1
+            if self.token_file:
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.token_file}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(self.to_json())
+            os.replace(tmp_path, self.token_file)
+        except Exception as e:
+            logger.warning(f"Could not save refreshed Google token to {self.token_file}: {e}")
+
+    def expires_in(self):
+        """Seconds until the access token expires, or None if unknown"""
+        if not self.expiry:
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (self.expiry - now).total_seconds()
+
+class GoogleTokenRefresher:
+    """Background thread refreshing registered credentials ahead of their expiry.
+
+    Credentials are held weakly, so those of evicted session clients drop out on
+    their own. A failed refresh is retried with backoff; until it succeeds, calls
+    still refresh on demand.
+    """
+
+    def __init__(self, margin_seconds):
+        self.margin_seconds = margin_seconds
+        self._credentials = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.stats = {"refreshes": 0, "failures": 0, "last_error": None}
+
+    def register(self, creds):
+        with self._lock:
+            self._credentials.add(creds)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="google-token-refresh", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        request = GoogleAuthRequest()
+        failures = 0
+        while True:
+            wait = 300.0
+            with self._lock:
+                registered = list(self._credentials)
+            for creds in registered:
+                if not creds.refresh_token:
+                    continue
+                expires_in = creds.expires_in()
+                if expires_in is None or expires_in <= self.margin_seconds:
+                    try:
+                        creds.refresh(request)
+                        self.stats["refreshes"] += 1
+                        failures = 0
+                        logger.debug("Refreshed Google access token in the background")
+                    except Exception as e:
+                        failures += 1
+                        self.stats["failures"] += 1
+                        self.stats["last_error"] = str(e)
+                        logger.warning(f"Background Google token refresh failed: {e}")
+                        wait = min(wait, GOOGLE_TOKEN_RETRY_SECONDS * 2 ** min(failures - 1, 4))
+                        continue
+                    expires_in = creds.expires_in()
+                if expires_in is not None:
+                    wait = min(wait, max(1.0, expires_in - self.margin_seconds))
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def snapshot(self):
+        with self._lock:
+            registered = list(self._credentials)
+        server = next((creds for creds in registered if creds.token_file), None)
+        expires_in = server.expires_in() if server is not None else None
+        return {
+            **self.stats,
+            "credentials": len(registered),
+            "server_token_expires_in_seconds": round(expires_in) if expires_in is not None else None
+        }
+
+google_token_refresher = GoogleTokenRefresher(GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS)
+
+# httplib2.Http is not thread-safe, so every Google request borrows a transport of its own
+GOOGLE_HTTP_POOL_SIZE = int(os.getenv("GOOGLE_HTTP_POOL_SIZE", "16"))
+GOOGLE_HTTP_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "60"))
+
+class GoogleHttpPool:
+    """Authorized HTTP transports for one set of credentials, lent to one request at a time.
+
+    A request borrows an idle transport, reusing its kept-alive connections, or a new
+    one if all are busy, so concurrent calls never share an `httplib2.Http`. Up to
+    `max_idle` transports are kept for reuse once returned.
+    """
+
+    def __init__(self, credentials, max_idle=GOOGLE_HTTP_POOL_SIZE):
+        self.credentials = credentials
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "in_use": 0, "peak_in_use": 0}
+        google_http_pools.add(self)
+
+    @contextmanager
+    def lend(self):
+        with self._lock:
+            http = self._idle.pop() if self._idle else None
+            self.stats["reused" if http else "created"] += 1
+            self.stats["in_use"] += 1
+            self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.stats["in_use"])
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT_SECONDS)
+            )
+        try:
+            yield http
+        finally:
+            with self._lock:
+                self.stats["in_use"] -= 1
+                keep = len(self._idle) < self.max_idle
+                if keep:
+                    self._idle.append(http)
+                else:
+                    self.stats["discarded"] += 1
+            if not keep:
+                http.http.close()
+
+    def request_builder(self, http, *args, **kwargs):
+        """`requestBuilder` for googleapiclient's build()"""
+        return PooledHttpRequest(self, http, *args, **kwargs)
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "idle": len(self._idle)}
+
+class PooledHttpRequest(HttpRequest):
+    """An API request that runs on a transport borrowed from its GoogleHttpPool"""
+
+    def __init__(self, pool, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+
+    def execute(self, http=None, num_retries=0):
+        if http is not None:
+            return super().execute(http=http, num_retries=num_retries)
+        with self.pool.lend() as pooled:
+            return super().execute(http=pooled, num_retries=num_retries)
+
+google_http_pools = weakref.WeakSet()
+
+def build_google_service(name, version, pool):
+    """Build an API client (from the bundled discovery document) whose requests use `pool`"""
+    return build(name, version, credentials=pool.credentials, requestBuilder=pool.request_builder)
+
 # Initialize Google APIs with comprehensive scopes
 try:
     logger.debug("Initializing Google APIs")
-    creds = Credentials.from_authorized_user_file(GOOGLE_TOKEN_FILE, GOOGLE_SCOPES)
+    creds = SerializedCredentials.from_authorized_user_file(GOOGLE_TOKEN_FILE, GOOGLE_SCOPES)
+    creds.token_file = GOOGLE_TOKEN_FILE
+    google_token_refresher.register(creds)
     
+    google_http_pool = GoogleHttpPool(creds)
+
     # Initialize Drive API
-    drive_service = build("drive", "v3", credentials=creds)
+    drive_service = build_google_service("drive", "v3", google_http_pool)
     logger.debug("Google Drive API initialized successfully")
     
     # Initialize Docs API
-    docs_service = build("docs", "v1", credentials=creds)
+    docs_service = build_google_service("docs", "v1", google_http_pool)
     docs_drive_service = drive_service  # Use same service instance
     logger.debug("Google Docs API initialized successfully")
     
@@ -66,98 +286,2698 @@ except Exception as e:
     logger.error(f"Failed to initialize Gemini API: {e}")
     gemini_model = None
 
+# The tool call the current thread is serving; defined early because startup requests already consult it
+_current_call = contextvars.ContextVar("current_call", default=None)
+
+# Circuit breakers: stop sending work to a backend that keeps failing or responding too slowly
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+class BackendUnavailable(Exception):
+    """A backend's circuit breaker is open; the call was rejected without being sent"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Circuit breaker around one backend.
+
+    Closed: calls go through; `failure_threshold` consecutive failures, or calls slower
+    than `latency_slo_seconds`, open the circuit. Open: calls are rejected at once with
+    BackendUnavailable for `open_seconds`. Half-open: a single probe call is let through;
+    its success closes the circuit, its failure opens it again. A call the caller gave up
+    on (its own deadline, cancellation) says nothing about the backend and changes neither
+    the state nor the failure count.
+    """
+
+    def __init__(self, name, latency_slo_seconds, is_failure,
+                 failure_threshold=CIRCUIT_FAILURE_THRESHOLD, open_seconds=CIRCUIT_OPEN_SECONDS):
+        self.name = name
+        self.latency_slo_seconds = latency_slo_seconds
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_failure = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected_calls": 0, "times_opened": 0}
+
+    def _reject(self):
+        self.stats["rejected_calls"] += 1
+        retry_after = max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+        return BackendUnavailable(
+            f"{self.name} is unavailable (circuit open: {self.last_failure}), retry in {retry_after:.0f}s",
+            retry_after
+        )
+
+    def check(self):
+        """Fail fast while the circuit is open, before queueing for quota or slots"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at < self.open_seconds:
+                raise self._reject()
+
+    def _before(self):
+        """Admit a call or raise BackendUnavailable; returns True if the call is the half-open probe"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = "half_open"
+            if self.state == "closed":
+                self.stats["calls"] += 1
+                return False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.stats["calls"] += 1
+                return True
+            raise self._reject()
+
+    def _release(self, probe):
+        """Let another call be the half-open probe, leaving state and failure count as they are"""
+        if probe:
+            with self._lock:
+                self._probe_in_flight = False
+
+    def _after(self, probe, failure):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            if failure is None:
+                self.consecutive_failures = 0
+                if self.state != "closed":
+                    logger.info(f"{self.name} circuit closed")
+                self.state = "closed"
+                return
+            self.consecutive_failures += 1
+            self.last_failure = failure
+            if probe or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["times_opened"] += 1
+                    logger.warning(f"{self.name} circuit opened: {failure}")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def call(self, fn, *args, failed=None, budget_seconds=None, **kwargs):
+        """Call `fn` through the breaker; `failed(result)` can flag a returned result as a failure.
+
+        `budget_seconds` is the time limit the caller gave `fn` from its own deadline. A
+        timeout under a limit shorter than the latency SLO is the caller's, not the backend's.
+        """
+        probe = self._before()
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            caller_timeout = (
+                budget_seconds is not None and budget_seconds < self.latency_slo_seconds and is_timeout(e)
+            )
+            if caller_timeout or isinstance(e, DeadlineExceeded) or not isinstance(e, Exception):
+                # The caller stopped waiting (deadline, cancellation); the backend never answered
+                self._release(probe)
+                raise
+            if not self.is_failure(e):
+                if backend_answered(e):
+                    # An error response such as a 404 shows the backend is up
+                    self._after(probe, None)
+                else:
+                    self._release(probe)
+                raise
+            with self._lock:
+                self.stats["failures"] += 1
+            self._after(probe, f"{e.__class__.__name__}: {e}"[:200])
+            raise
+        elapsed = time.monotonic() - started
+        failure = None
+        if failed is not None and failed(result):
+            with self._lock:
+                self.stats["failures"] += 1
+            failure = f"failed response after {elapsed:.1f}s"
+        elif elapsed > self.latency_slo_seconds:
+            with self._lock:
+                self.stats["slow_calls"] += 1
+            failure = f"{elapsed:.2f}s response, SLO {self.latency_slo_seconds:g}s"
+        self._after(probe, failure)
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == "open":
+                retry_in = round(max(0.0, self.opened_at + self.open_seconds - time.monotonic()), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "last_failure": self.last_failure,
+                "half_open_in_seconds": retry_in,
+                "latency_slo_seconds": self.latency_slo_seconds,
+                **self.stats
+            }
+
+def is_timeout(error):
+    return isinstance(error, (TimeoutError, google_exceptions.DeadlineExceeded, requests.exceptions.Timeout))
+
+def backend_answered(error):
+    """Whether an error carries the backend's own response (e.g. a 404)"""
+    return isinstance(error, (HttpError, GithubException, google_exceptions.GoogleAPICallError)) and not is_timeout(error)
+
+def github_failure(error):
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+def google_api_failure(error):
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) and not isinstance(error, DeadlineExceeded)
+
+def gemini_failure(error):
+    return isinstance(error, (
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        ConnectionError
+    ))
+
+circuit_breakers = {
+    "github": CircuitBreaker("GitHub", float(os.getenv("GITHUB_LATENCY_SLO_SECONDS", "10")), github_failure),
+    "gemini": CircuitBreaker("Gemini", float(os.getenv("GEMINI_LATENCY_SLO_SECONDS", "60")), gemini_failure),
+    "drive": CircuitBreaker("Google Drive", float(os.getenv("GOOGLE_API_LATENCY_SLO_SECONDS", "20")), google_api_failure),
+    "docs": CircuitBreaker("Google Docs", float(os.getenv("GOOGLE_API_LATENCY_SLO_SECONDS", "20")), google_api_failure),
+}
+
+# GitHub rate limiting: every request waits its turn against the budget GitHub reports
+GITHUB_PACING_THRESHOLD = float(os.getenv("GITHUB_PACING_THRESHOLD", "0.2"))
+GITHUB_MAX_QUEUE_SECONDS = float(os.getenv("GITHUB_MAX_QUEUE_SECONDS", "900"))
+# Requests outside a tool call (startup, health probes) have no deadline to bound a wait, so they fail fast instead
+GITHUB_BACKGROUND_MAX_WAIT_SECONDS = 5.0
+GITHUB_SECONDARY_LIMIT_WAIT_SECONDS = 60
+
+class GitHubRateLimitScheduler:
+    """Paces GitHub API requests by the rate limit GitHub reports in its response headers.
+
+    Budgets are tracked per token and resource (core, search, graphql). Once less than
+    GITHUB_PACING_THRESHOLD of a budget is left, requests are spaced evenly over the rest
+    of the reset window; an exhausted budget, a Retry-After header or a secondary rate
+    limit makes requests queue until GitHub accepts them again instead of failing.
+    """
+
+    def __init__(self, pacing_threshold=GITHUB_PACING_THRESHOLD):
+        self.pacing_threshold = pacing_threshold
+        self._budgets = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "queued_requests": 0,
+            "queued_seconds": 0.0,
+            "rate_limited_responses": 0,
+            "retried_requests": 0
+        }
+
+    @staticmethod
+    def fingerprint(authorization):
+        return hashlib.sha256(authorization.encode()).hexdigest()[:12] if authorization else "anonymous"
+
+    def set_label(self, authorization, label):
+        """Report the budget of the token sending `authorization` under `label` instead of its fingerprint"""
+        with self._lock:
+            self._labels[self.fingerprint(authorization)] = label
+
+    def remaining(self, token, resource="core"):
+        """Last known remaining budget for a token label, or None if not known (unused or reset since)"""
+        with self._lock:
+            budget = self._budgets.get((token, resource))
+            if budget is None or budget["remaining"] is None or time.time() >= budget["reset"]:
+                return None
+            return budget["remaining"], budget["limit"]
+
+    def budget_key(self, authorization, url):
+        """Budget a request draws from: its token's label (or fingerprint) and the API resource"""
+        fingerprint = self.fingerprint(authorization)
+        token = self._labels.get(fingerprint, fingerprint)
+        if url.startswith("/search/"):
+            resource = "search"
+        elif url.startswith("/graphql"):
+            resource = "graphql"
+        else:
+            resource = "core"
+        return token, resource
+
+    def _budget(self, key):
+        if key not in self._budgets:
+            self._budgets[key] = {
+                "limit": None, "remaining": None, "reset": 0.0,
+                "next_request_at": 0.0, "blocked_until": 0.0, "queued": 0, "requests": 0
+            }
+        return self._budgets[key]
+
+    def acquire(self, key, retry=False):
+        """Wait until a request may be sent against the budget for `key`"""
+        with self._lock:
+            if retry:
+                self.stats["retried_requests"] += 1
+            budget = self._budget(key)
+            now = time.time()
+            if budget["remaining"] is not None and now >= budget["reset"]:
+                # The window has rolled over; the next response reports the new budget
+                budget["remaining"] = None
+            start = max(now, budget["blocked_until"])
+            remaining = budget["remaining"]
+            if remaining is not None:
+                if remaining <= 0:
+                    start = max(start, budget["reset"])
+                elif remaining <= budget["limit"] * self.pacing_threshold:
+                    # Spread what is left evenly over the rest of the window
+                    start = max(start, budget["next_request_at"])
+                    budget["next_request_at"] = start + max(0.0, budget["reset"] - start) / remaining
+                # Count the request now so concurrent callers don't spend the same budget
+                budget["remaining"] = max(0, remaining - 1)
+            self.stats["requests"] += 1
+            budget["requests"] += 1
+            delay = start - now
+            if delay <= 0:
+                return
+            if delay > GITHUB_MAX_QUEUE_SECONDS:
+                raise DeadlineExceeded(f"GitHub rate limit blocks requests for another {delay:.0f}s")
+            background = _current_call.get() is None
+            if background and delay > GITHUB_BACKGROUND_MAX_WAIT_SECONDS:
+                raise BackendUnavailable(f"GitHub rate limit blocks requests for another {delay:.0f}s", delay)
+            budget["queued"] += 1
+            self.stats["queued_requests"] += 1
+        logger.debug(f"Queueing GitHub request for {delay:.2f}s ({key[1]} budget)")
+        try:
+            if background:
+                # Startup requests run before pause() is defined, and outside a call it would only sleep
+                time.sleep(delay)
+            else:
+                pause(delay)
+        finally:
+            with self._lock:
+                budget["queued"] -= 1
+                self.stats["queued_seconds"] += delay
+
+    def record(self, key, status, headers, body=None):
+        """Update the budget from a response; return True if GitHub rate limited the request"""
+        now = time.time()
+        with self._lock:
+            budget = self._budget(key)
+            if "x-ratelimit-remaining" in headers:
+                budget["remaining"] = int(headers["x-ratelimit-remaining"])
+                budget["limit"] = int(headers.get("x-ratelimit-limit", budget["limit"] or 0))
+                budget["reset"] = float(headers.get("x-ratelimit-reset", budget["reset"]))
+            if status not in (403, 429):
+                return False
+            if "retry-after" in headers:
+                blocked_until = now + float(headers["retry-after"])
+            elif budget["remaining"] == 0:
+                blocked_until = budget["reset"]
+            elif body and "secondary rate limit" in body:
+                blocked_until = now + GITHUB_SECONDARY_LIMIT_WAIT_SECONDS
+            else:
+                # An ordinary permission error
+                return False
+            budget["blocked_until"] = max(budget["blocked_until"], blocked_until)
+            self.stats["rate_limited_responses"] += 1
+        logger.warning(f"GitHub rate limited a {key[1]} request, queueing for {blocked_until - now:.0f}s")
+        return True
+
+    def snapshot(self):
+        """Current budgets and counters for get_server_stats"""
+        now = time.time()
+        with self._lock:
+            budgets = [
+                {
+                    "token": token,
+                    "resource": resource,
+                    "limit": budget["limit"],
+                    "remaining": budget["remaining"],
+                    "resets_in_seconds": round(max(0.0, budget["reset"] - now), 1) if budget["remaining"] is not None else None,
+                    "blocked_for_seconds": round(max(0.0, budget["blocked_until"] - now), 1),
+                    "queued_requests": budget["queued"],
+                    "requests": budget["requests"]
+                }
+                for (token, resource), budget in self._budgets.items()
+            ]
+            return {**self.stats, "queued_seconds": round(self.stats["queued_seconds"], 3), "budgets": budgets}
+
+github_scheduler = GitHubRateLimitScheduler()
+
+# PyGithub opens a new requests.Session (and TLS connection) for every request; all GitHub
+# clients instead share one keep-alive connection pool sized for concurrent tool calls
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "32"))
+GITHUB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GITHUB_CONNECT_TIMEOUT_SECONDS", "5"))
+GITHUB_READ_TIMEOUT_SECONDS = float(os.getenv("GITHUB_READ_TIMEOUT_SECONDS", "30"))
+
+class GitHubHttpSession:
+    """The pooled keep-alive session every GitHub request is sent through.
+
+    Connections to each host are kept open and reused across requests, threads and
+    GitHub clients (authorization is per request), responses are gzip-compressed,
+    and urllib3 retries server errors. Reuse counts come from urllib3's pools: every
+    new HTTPS connection is one TLS handshake.
+    """
+
+    def __init__(self, pool_size):
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        # Session.auth set to something other than None stops requests from reading .netrc
+        self.session.auth = Requester.noopAuth
+        self.session.headers["Accept-Encoding"] = "gzip"
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def snapshot(self):
+        pools = self.adapter.poolmanager.pools
+        hosts = []
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts.append({
+                "host": f"{pool.scheme}://{pool.host}",
+                "requests": pool.num_requests,
+                "connections_opened": pool.num_connections,
+                # urllib3 fills the queue with None placeholders for connections not yet opened
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            })
+        sent = sum(host["requests"] for host in hosts)
+        opened = sum(host["connections_opened"] for host in hosts)
+        return {
+            "requests": sent,
+            "connections_opened": opened,
+            "connections_reused": max(0, sent - opened),
+            "tls_handshakes": sum(host["connections_opened"] for host in hosts if host["host"].startswith("https")),
+            "pool_size": self.pool_size,
+            "hosts": hosts
+        }
+
+github_http = GitHubHttpSession(GITHUB_POOL_SIZE)
+
+class ScheduledConnectionMixin:
+    """PyGithub connection that sends every request through github_scheduler and the shared session.
+
+    PyGithub creates one of these per request, so it only carries that request's state.
+    """
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        self.host = host
+        self.port = port if port else self.default_port
+        self.timeout = (GITHUB_CONNECT_TIMEOUT_SECONDS, GITHUB_READ_TIMEOUT_SECONDS)
+        self.verify = kwargs.get("verify", True)
+        self.session = github_http.session
+
+    def close(self):
+        pass  # The session is shared; its connections stay open for the next request
+
+    def getresponse(self):
+        key = github_scheduler.budget_key(self.headers.get("Authorization"), self.url)
+        retry = False
+        while True:
+            circuit_breakers["github"].check()
+            github_scheduler.acquire(key, retry)
+            response = circuit_breakers["github"].call(super().getresponse, failed=lambda r: r.status >= 500)
+            headers = {k.lower(): v for k, v in response.getheaders()}
+            body = response.read() if response.status in (403, 429) and not self.stream else None
+            if not github_scheduler.record(key, response.status, headers, body):
+                return response
+            if self.stream or isinstance(self.input, io.IOBase):
+                # The request body has been consumed and can't be sent again
+                return response
+            retry = True
+
+class ScheduledHTTPConnection(ScheduledConnectionMixin, HTTPRequestsConnectionClass):
+    protocol = "http"
+    default_port = 80
+
+class ScheduledHTTPSConnection(ScheduledConnectionMixin, HTTPSRequestsConnectionClass):
+    protocol = "https"
+    default_port = 443
+
+def make_github_client(auth):
+    """Create a GitHub client on the shared session; rate limits are handled by github_scheduler"""
+    # PyGithub picks its connection classes when the client is built, so they must be in place first
+    Requester.injectConnectionClasses(ScheduledHTTPConnection, ScheduledHTTPSConnection)
+    return Github(auth=auth, seconds_between_requests=None)
+
 # Initialize GitHub API
 try:
     if GITHUB_TOKEN and GITHUB_TOKEN != "your_token_here":
         logger.debug("Initializing GitHub API")
-        github_client = Github(GITHUB_TOKEN)
+        github_client = make_github_client(Auth.Token(GITHUB_TOKEN))
+        github_scheduler.set_label(f"token {GITHUB_TOKEN}", "owner")
         # Test the connection (but don't fail if it's invalid)
         try:
-            user = github_client.get_user()
-            logger.debug(f"GitHub API initialized successfully for user: {user.login}")
-        except Exception as auth_error:
-            logger.warning(f"GitHub token may be invalid: {auth_error}")
-            logger.warning("GitHub operations will not work until a valid token is provided.")
-    else:
-        logger.warning("GitHub token not configured. GitHub operations will not be available.")
-        github_client = None
-except Exception as e:
-    logger.error(f"Failed to initialize GitHub API: {e}")
-    github_client = None
+            user = github_client.get_user()
+            logger.debug(f"GitHub API initialized successfully for user: {user.login}")
+        except Exception as auth_error:
+            logger.warning(f"GitHub token may be invalid: {auth_error}")
+            logger.warning("GitHub operations will not work until a valid token is provided.")
+    else:
+        logger.warning("GitHub token not configured. GitHub operations will not be available.")
+        github_client = None
+except Exception as e:
+    logger.error(f"Failed to initialize GitHub API: {e}")
+    github_client = None
+
+# Extra credentials for read-only GitHub calls, used alongside GITHUB_TOKEN
+GITHUB_READ_TOKENS = [token.strip() for token in os.getenv("GITHUB_READ_TOKENS", "").split(",") if token.strip()]
+GITHUB_APP_ID = os.getenv("GITHUB_APP_ID")
+GITHUB_APP_PRIVATE_KEY_FILE = os.getenv("GITHUB_APP_PRIVATE_KEY_FILE")
+GITHUB_APP_INSTALLATION_IDS = [i.strip() for i in os.getenv("GITHUB_APP_INSTALLATION_IDS", "").split(",") if i.strip()]
+
+class GitHubTokenPool:
+    """GitHub clients that read-only calls are spread across.
+
+    The owner's client (GITHUB_TOKEN) is always in the pool and is the only one used
+    for writes and for listing the owner's repositories. Each read picks the client
+    whose token has the most rate limit left, as seen by github_scheduler.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def add(self, label, kind, client, auth):
+        self.entries.append({"label": label, "kind": kind, "client": client, "auth": auth, "reads": 0})
+
+    def _remaining(self, entry):
+        # App installation tokens rotate, so (re)register the current token under the entry's label;
+        # reading an expired one fetches a new token over the network
+        try:
+            github_scheduler.set_label(f"{entry['auth'].token_type} {entry['auth'].token}", entry["label"])
+        except Exception as e:
+            logger.warning(f"Could not get a token for {entry['label']}: {e}")
+            return -1
+        budget = github_scheduler.remaining(entry["label"])
+        # Tokens with no known budget (unused, or reset since) are assumed to be fresh
+        return float("inf") if budget is None else budget[0]
+
+    def read_client(self):
+        """The client with the most remaining budget for the next read-only call"""
+        if not self.entries:
+            return None
+        # Budgets are read outside the lock, so a token refresh doesn't hold up every other read
+        budgets = [(self._remaining(entry), entry) for entry in list(self.entries)]
+        entry = max(budgets, key=lambda budget: budget[0])[1]
+        with self._lock:
+            entry["reads"] += 1
+        return entry["client"]
+
+    def best_remaining(self):
+        """Largest remaining budget across the pool, or None if none is known"""
+        budgets = [self._remaining(entry) for entry in self.entries]
+        best = max(budgets, default=float("inf"))
+        return None if best == float("inf") else best
+
+    def snapshot(self):
+        """Per-token usage for get_server_stats"""
+        usage = []
+        for entry in self.entries:
+            budget = github_scheduler.remaining(entry["label"])
+            usage.append({
+                "token": entry["label"],
+                "kind": entry["kind"],
+                "read_calls_routed": entry["reads"],
+                "remaining": budget[0] if budget else None,
+                "limit": budget[1] if budget else None
+            })
+        return usage
+
+github_pool = GitHubTokenPool()
+if github_client:
+    github_pool.add("owner", "owner", github_client, github_client.requester.auth)
+for number, token in enumerate(GITHUB_READ_TOKENS, 1):
+    auth = Auth.Token(token)
+    github_pool.add(f"read-{number}", "token", make_github_client(auth), auth)
+if GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_FILE:
+    try:
+        with open(GITHUB_APP_PRIVATE_KEY_FILE) as key_file:
+            app_auth = Auth.AppAuth(GITHUB_APP_ID, key_file.read())
+        for installation_id in GITHUB_APP_INSTALLATION_IDS:
+            auth = app_auth.get_installation_auth(int(installation_id))
+            github_pool.add(f"app-{installation_id}", "app_installation", make_github_client(auth), auth)
+    except Exception as e:
+        logger.error(f"Failed to load GitHub App credentials: {e}")
+for entry in github_pool.entries:
+    # App installation tokens are fetched lazily and registered when first used
+    if entry["kind"] != "app_installation":
+        github_scheduler.set_label(f"{entry['auth'].token_type} {entry['auth'].token}", entry["label"])
+logger.debug(f"GitHub read pool: {[entry['label'] for entry in github_pool.entries]}")
+
+def get_repo_for_read(repo_name):
+    """Fetch a repository through the read pool for read-only use.
+
+    The pool acts with the server's credentials, so only calls outside a credentialed
+    session use it; a session reads with its own client and sees only what its token can.
+    Falls back to the owner's token for repositories the pool token can't see (e.g. private ones).
+    """
+    own_client = github_client.resolve()
+    if _session_clients.get() is not None:
+        return own_client.get_repo(repo_name)
+    client = github_pool.read_client() or own_client
+    try:
+        return client.get_repo(repo_name)
+    except UnknownObjectException:
+        if client is own_client:
+            raise
+        return own_client.get_repo(repo_name)
+
+# Local index of Colab notebooks, kept current from the Drive Changes API
+COLAB_MIME_TYPE = "application/vnd.google.colaboratory"
+COLAB_INDEX_FILE = os.getenv("COLAB_INDEX_FILE", os.path.join(GOOGLE_CREDENTIALS_DIR, "colab_index.json"))
+COLAB_INDEX_REFRESH_SECONDS = float(os.getenv("COLAB_INDEX_REFRESH_SECONDS", "30"))
+COLAB_INDEX_FIELDS = "id, name, mimeType, parents, modifiedTime, md5Checksum, webViewLink, trashed"
+
+class ColabIndex:
+    """Local index of the user's Colab notebooks.
+
+    The index is built once with a full Drive listing and then kept current by
+    replaying `changes.list` from a persisted `startPageToken`, so listing
+    notebooks no longer needs a fresh Drive query per call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.start_page_token = None
+        self.last_sync = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load a previously persisted index from disk, if any"""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.start_page_token = data.get("start_page_token")
+            logger.debug(f"Loaded Colab index with {len(self.files)} notebooks from {self.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not load Colab index from {self.path}, it will be rebuilt: {e}")
+
+    def _save(self):
+        """Persist the index atomically so a crash never leaves a torn file"""
+        # Per-process temp file so workers saving at the same time don't interleave writes
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"start_page_token": self.start_page_token, "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist Colab index to {self.path}: {e}")
+
+    @staticmethod
+    def _entry(file):
+        return {
+            "id": file["id"],
+            "name": file.get("name"),
+            "parents": file.get("parents", []),
+            "modifiedTime": file.get("modifiedTime"),
+            "md5": file.get("md5Checksum"),
+            "link": file.get("webViewLink")
+        }
+
+    def _rebuild(self, service):
+        """Full listing of all notebooks; only needed once or when the change token expires"""
+        logger.debug("Building Colab index from a full Drive listing")
+        # Take the token before listing so no change made during the listing is lost
+        start_page_token = google_execute(service.changes().getStartPageToken())["startPageToken"]
+        files = {}
+        page_token = None
+        while True:
+            results = google_execute(service.files().list(
+                q=f"mimeType='{COLAB_MIME_TYPE}' and trashed=false",
+                fields=f"nextPageToken, files({COLAB_INDEX_FIELDS})",
+                pageSize=1000,
+                pageToken=page_token
+            ))
+            for file in results.get("files", []):
+                files[file["id"]] = self._entry(file)
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+        self.files = files
+        self.start_page_token = start_page_token
+        logger.debug(f"Colab index built with {len(files)} notebooks")
+
+    def _apply_changes(self, service):
+        """Replay Drive changes since the stored token into the index"""
+        page_token = self.start_page_token
+        applied = 0
+        while page_token:
+            results = google_execute(service.changes().list(
+                pageToken=page_token,
+                spaces="drive",
+                includeRemoved=True,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({COLAB_INDEX_FIELDS}))",
+                pageSize=1000
+            ))
+            for change in results.get("changes", []):
+                file = change.get("file")
+                if change.get("removed") or not file or file.get("trashed") or file.get("mimeType") != COLAB_MIME_TYPE:
+                    if self.files.pop(change["fileId"], None):
+                        applied += 1
+                else:
+                    self.files[file["id"]] = self._entry(file)
+                    applied += 1
+            if "newStartPageToken" in results:
+                self.start_page_token = results["newStartPageToken"]
+                break
+            page_token = results.get("nextPageToken")
+        if applied:
+            logger.debug(f"Applied {applied} Drive changes to the Colab index")
+
+    def sync(self, service, force=False):
+        """Bring the index up to date, at most once per refresh interval unless forced"""
+        with self._lock:
+            if self.start_page_token and not force and time.monotonic() - self.last_sync < COLAB_INDEX_REFRESH_SECONDS:
+                return
+            if not self.start_page_token:
+                self._rebuild(service)
+            else:
+                try:
+                    self._apply_changes(service)
+                except HttpError as e:
+                    # An expired or invalid change token means the index must be rebuilt
+                    if e.resp.status not in (400, 404, 410):
+                        raise
+                    logger.warning(f"Drive change token rejected ({e.resp.status}), rebuilding Colab index")
+                    self._rebuild(service)
+            self.last_sync = time.monotonic()
+            self._save()
+
+    def rebuild(self, service):
+        """Discard the index and build it again from a full listing"""
+        with self._lock:
+            self._rebuild(service)
+            self.last_sync = time.monotonic()
+            self._save()
+
+    def list(self, folder_id=None):
+        """Indexed notebooks, most recently modified first"""
+        with self._lock:
+            entries = [dict(f) for f in self.files.values() if not folder_id or folder_id in f["parents"]]
+        return sorted(entries, key=lambda f: f.get("modifiedTime") or "", reverse=True)
+
+    def get(self, file_id):
+        with self._lock:
+            entry = self.files.get(file_id)
+            return dict(entry) if entry else None
+
+    def status(self):
+        with self._lock:
+            return {"notebook_count": len(self.files), "start_page_token": self.start_page_token}
+
+    def flush(self):
+        """Write the index to disk now, e.g. before the process exits"""
+        with self._lock:
+            if self.start_page_token:
+                self._save()
+
+colab_index = ColabIndex(COLAB_INDEX_FILE)
+
+def resolve_workers(workers):
+    """Worker process count for --workers / MCP_WORKERS, where 0 means one per CPU core"""
+    return workers if workers > 0 else os.cpu_count() or 1
+
+# Worker processes started by --workers; process-wide backend budgets are split between them
+HTTP_WORKERS = resolve_workers(int(os.getenv("MCP_WORKERS", "1")))
+
+def worker_share(limit):
+    """This worker's part of a budget that all worker processes draw from"""
+    return max(1, limit // HTTP_WORKERS) if isinstance(limit, int) else limit / HTTP_WORKERS
+
+# Cache shared by every worker process on this machine
+SHARED_CACHE_FILE = os.getenv("SHARED_CACHE_FILE", os.path.join(GOOGLE_CREDENTIALS_DIR, "shared_cache.sqlite3"))
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "5000"))
+REPO_CACHE_TTL_SECONDS = float(os.getenv("REPO_CACHE_TTL_SECONDS", "3600"))
+GEMINI_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "86400"))
+NOTEBOOK_CACHE_MAX_ENTRIES = int(os.getenv("NOTEBOOK_CACHE_MAX_ENTRIES", "200"))
+
+class SharedCache:
+    """JSON values in a SQLite file, shared by all worker processes.
+
+    SQLite's file locking serializes writers across processes and WAL mode lets
+    readers proceed during a write, reading through a memory-mapped file. Each thread
+    uses its own connection. A cache failure is logged and treated as a miss, never
+    as a tool error.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA mmap_size=67108864")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (namespace TEXT, key TEXT, value TEXT, "
+                "stored_at REAL, expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.connection = connection
+        return connection
+
+    def _record(self, namespace, outcome):
+        with self._stats_lock:
+            counts = self.stats.setdefault(namespace, {"hits": 0, "misses": 0, "writes": 0, "errors": 0})
+            counts[outcome] += 1
+
+    def get(self, namespace, key):
+        """The cached value, or None if absent, expired or unreadable"""
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            self._record(namespace, "errors")
+            return None
+        self._record(namespace, "hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace, key, value, ttl=None, max_entries=None):
+        """Store a value; with `max_entries`, the namespace's oldest entries beyond it are dropped"""
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now, now + ttl if ttl else None)
+            )
+            if max_entries:
+                connection.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache WHERE namespace = ? "
+                    "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (namespace, max_entries)
+                )
+            self._record(namespace, "writes")
+            with self._stats_lock:
+                self._writes += 1
+                prune = self._writes % 100 == 0
+            if prune:
+                self._prune(connection, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed: {e}")
+            self._record(namespace, "errors")
+
+    def _prune(self, connection, now):
+        """Drop expired entries, then the oldest ones beyond the size limit"""
+        connection.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def checkpoint(self):
+        """Fold the write-ahead log into the database file so nothing is left only in the WAL"""
+        try:
+            self._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache checkpoint failed: {e}")
+            return False
+
+    def snapshot(self):
+        try:
+            entries = dict(self._connection().execute("SELECT namespace, COUNT(*) FROM cache GROUP BY namespace").fetchall())
+        except sqlite3.Error:
+            entries = {}
+        with self._stats_lock:
+            namespaces = {namespace: dict(counts) for namespace, counts in self.stats.items()}
+        for namespace, count in entries.items():
+            namespaces.setdefault(namespace, {})["entries"] = count
+        return {"path": self.path, "worker_pid": os.getpid(), "workers": HTTP_WORKERS, "namespaces": namespaces}
+
+shared_cache = SharedCache(SHARED_CACHE_FILE, SHARED_CACHE_MAX_ENTRIES)
+
+# CPU-bound stages (parsing large notebooks, encoding large results) run in worker processes
+# so they don't hold the GIL that the event loop and the tool threads need; 0 keeps them in-process
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, max(1, (os.cpu_count() or 1) // HTTP_WORKERS)))))
+# Below this size a stage runs in-process, where it is cheaper than the round trip to a worker
+CPU_OFFLOAD_MIN_BYTES = int(os.getenv("CPU_OFFLOAD_MIN_BYTES", str(1024 * 1024)))
+
+def parse_notebook(raw):
+    """Metadata and cell sources of a notebook from its raw .ipynb content"""
+    notebook_content = json.loads(raw)
+    metadata = {
+        "name": notebook_content.get("metadata", {}).get("colab", {}).get("name", "Unknown"),
+        "cell_count": len(notebook_content.get("cells", []))
+    }
+    cells = [
+        {
+            "cell_type": cell.get("cell_type"),
+            "source": "".join(cell.get("source", [])) if cell.get("source") else ""
+        }
+        for cell in notebook_content.get("cells", [])
+    ]
+    return {"metadata": metadata, "cells": cells}
+
+def encode_result(value):
+    """A tool result as the indented JSON text MCP clients receive"""
+    return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+
+def approximate_size(value, limit):
+    """Rough encoded size of a JSON-like value, counted only until it reaches `limit`"""
+    size = 0
+    pending = [value]
+    while pending and size < limit:
+        item = pending.pop()
+        if isinstance(item, str):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            size += 2
+            pending.extend(item)
+        else:
+            size += 8
+    return size
+
+def _share_bytes(data):
+    """Copy `data` into a new shared memory block; the creator unlinks it when done"""
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return shm
+
+def _release_shared(shm):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+def _take_shared(name, size):
+    """The bytes a worker left in shared memory, unlinking the block"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        _release_shared(shm)
+
+def _init_cpu_worker():
+    # Forked workers inherit the server's shutdown handlers; Ctrl-C is for the server to handle
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def _parse_shared_notebook(name, size):
+    """Worker side of CpuPool.parse_notebook: the raw notebook is read from shared memory"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        raw = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    return parse_notebook(raw)
+
+def _encode_shared_result(value):
+    """Worker side of CpuPool.encode_result: the UTF-8 JSON text goes back through shared memory"""
+    data = encode_result(value).encode("utf-8", "surrogatepass")
+    shm = _share_bytes(data)
+    shm.close()
+    return shm.name, len(data)
+
+class CpuPool:
+    """Worker processes for the CPU-bound stages of tool calls.
+
+    Raw bytes go to the workers and come back through shared memory instead of being
+    pickled through the executor's pipe. Workers are forked once, at startup before any
+    tool call runs: the spawn and forkserver methods would re-import this module, with
+    its backend clients, in every worker. Threads started at import (the Google token
+    refresher) already exist then, so workers only run the self-contained parse and
+    encode functions (logging's locks are reset by Python after a fork). Waits honour
+    the current tool call's cancellation and deadline. If the pool breaks, it is not
+    forked again while the server is busy: every later stage runs in-process until the
+    process restarts.
+    """
+
+    def __init__(self, workers, min_bytes):
+        # Workers must be forked; where that isn't available every stage runs in-process
+        self.workers = workers if "fork" in multiprocessing.get_all_start_methods() else 0
+        self.min_bytes = min_bytes
+        self._executor = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self.stats = {"offloaded": 0, "inline": 0, "bytes_shared": 0, "pool_failures": 0, "worker_seconds": 0.0}
+
+    def start(self):
+        """Fork the workers now, if they aren't running; call at startup only, never from a tool call.
+
+        Returns the executor, or None without a pool (or after it broke).
+        """
+        with self._lock:
+            if self.workers <= 0 or self._failed or self._executor is not None:
+                return self._executor
+            # Workers must report their shared memory to the server's tracker, not start their own
+            resource_tracker.ensure_running()
+            executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("fork"), initializer=_init_cpu_worker
+            )
+            # A fork-based pool starts all of its workers on the first submit
+            executor.submit(int).result()
+            self._executor = executor
+            logger.info(f"CPU pool started with {self.workers} worker processes")
+            return executor
+
+    def shutdown(self):
+        """Stop the workers; nothing is left for them once the server has drained"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _ready(self):
+        """The running executor, or None to stay in-process; never forks"""
+        with self._lock:
+            return self._executor
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _broken(self, executor, error):
+        logger.warning(f"CPU pool failed, running in-process until the server restarts: {error}")
+        self._count("pool_failures")
+        with self._lock:
+            self._failed = True
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, executor, fn, args, shared=None, abandoned=None):
+        """fn(*args) in a worker, waiting within the current tool call's cancellation and deadline.
+
+        `shared` is unlinked once the worker is done with it. If the caller stops
+        waiting, `abandoned` is applied to the result nobody will collect.
+        """
+        call = _current_call.get()
+        started = time.monotonic()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            if shared is not None:
+                _release_shared(shared)
+            raise
+        if shared is not None:
+            future.add_done_callback(lambda _: _release_shared(shared))
+        try:
+            while True:
+                remaining = call.remaining() if call is not None else None
+                timeout = CANCEL_POLL_SECONDS if remaining is None else min(CANCEL_POLL_SECONDS, remaining)
+                try:
+                    result = future.result(timeout=timeout)
+                    break
+                except FutureTimeoutError:
+                    if future.done():
+                        raise  # The stage itself raised a TimeoutError
+                    if call is not None:
+                        call.check()
+                        if call.remaining() == 0:
+                            raise DeadlineExceeded(f"{call.name} deadline exceeded while waiting on the CPU pool")
+        except (ToolCancelled, DeadlineExceeded):
+            if not future.cancel() and abandoned is not None:
+                future.add_done_callback(
+                    lambda done: done.cancelled() or done.exception() is not None or abandoned(done.result())
+                )
+            raise
+        self._count("offloaded")
+        self._count("worker_seconds", time.monotonic() - started)
+        return result
+
+    def parse_notebook(self, raw):
+        """Parse raw .ipynb content, in a worker process when it is large"""
+        executor = self._ready() if len(raw) >= self.min_bytes else None
+        if executor is not None:
+            shm = _share_bytes(raw)
+            self._count("bytes_shared", len(raw))
+            try:
+                return self._run(executor, _parse_shared_notebook, (shm.name, len(raw)), shared=shm)
+            except BrokenProcessPool as e:
+                self._broken(executor, e)
+        self._count("inline")
+        return parse_notebook(raw)
+
+    def encode_result(self, value):
+        """A large tool result encoded to JSON text in a worker process; smaller ones unchanged"""
+        if not isinstance(value, (dict, list)) or approximate_size(value, self.min_bytes) < self.min_bytes:
+            return value
+        executor = self._ready()
+        if executor is not None:
+            try:
+                name, size = self._run(
+                    executor, _encode_shared_result, (value,), abandoned=lambda shared: _take_shared(*shared)
+                )
+                self._count("bytes_shared", size)
+                return _take_shared(name, size).decode("utf-8", "surrogatepass")
+            except BrokenProcessPool as e:
+                self._broken(executor, e)
+            except Exception as e:
+                # The result is ready either way; encode it here rather than lose it
+                logger.warning(f"Encoding in the CPU pool failed, encoding in-process: {e}")
+        self._count("inline")
+        return encode_result(value)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            running = self._executor is not None
+            failed = self._failed
+        return {"workers": self.workers, "running": running, "failed": failed, "min_bytes": self.min_bytes, **stats}
+
+cpu_pool = CpuPool(CPU_POOL_WORKERS, CPU_OFFLOAD_MIN_BYTES)
+
+# Google API quotas in requests per minute per user, shared by every Drive/Docs tool;
+# set these to the project's quotas from the Cloud console
+GOOGLE_API_QUOTAS = {
+    "drive": worker_share(float(os.getenv("DRIVE_REQUESTS_PER_MINUTE", "12000"))),
+    "docs_read": worker_share(float(os.getenv("DOCS_READ_REQUESTS_PER_MINUTE", "300"))),
+    "docs_write": worker_share(float(os.getenv("DOCS_WRITE_REQUESTS_PER_MINUTE", "60"))),
+}
+GOOGLE_API_BURST_SECONDS = 10  # Bucket capacity, in seconds' worth of quota
+GOOGLE_API_MAX_RETRIES = int(os.getenv("GOOGLE_API_MAX_RETRIES", "5"))
+GOOGLE_API_BACKOFF_BASE_SECONDS = 1.0
+GOOGLE_API_BACKOFF_MAX_SECONDS = 32.0
+GOOGLE_RATE_LIMIT_REASONS = ("userRateLimitExceeded", "rateLimitExceeded")
+
+class TokenBucket:
+    """Token bucket refilled at `rate_per_minute`, holding at most `capacity` tokens"""
+
+    def __init__(self, rate_per_minute, capacity):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take `tokens` and return how long to wait before using them (0 if available now).
+
+        The bucket may go negative, so concurrent callers queue up in the order they reserved.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+def google_retryable(error):
+    """Whether a Google API error is worth retrying: rate limits and server errors"""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    if status == 429 or status >= 500:
+        return True
+    content = error.content.decode(errors="ignore") if isinstance(error.content, bytes) else str(error.content)
+    return status == 403 and any(reason in content for reason in GOOGLE_RATE_LIMIT_REASONS)
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)"""
+    return random.uniform(0, min(GOOGLE_API_BACKOFF_MAX_SECONDS, GOOGLE_API_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+class GoogleApiLimiter:
+    """Per-API token buckets sized to the Google quotas, with metrics on throttling and retries"""
+
+    def __init__(self, quotas):
+        self.buckets = {
+            api: TokenBucket(rate, rate / 60.0 * GOOGLE_API_BURST_SECONDS) for api, rate in quotas.items()
+        }
+        self.metrics = {
+            api: {
+                "requests": 0,
+                "throttled_requests": 0,
+                "throttled_seconds": 0.0,
+                "retryable_errors": 0,
+                "retries": 0,
+                "failed_requests": 0
+            }
+            for api in quotas
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def api_for(request):
+        """Quota bucket an HttpRequest draws from"""
+        if "docs.googleapis.com" in request.uri:
+            return "docs_read" if request.method == "GET" else "docs_write"
+        return "drive"
+
+    def throttle(self, api, cost=1):
+        """Wait for `cost` requests' worth of quota"""
+        wait = self.buckets[api].reserve(cost)
+        with self._lock:
+            self.metrics[api]["requests"] += cost
+            if wait > 0:
+                self.metrics[api]["throttled_requests"] += 1
+                self.metrics[api]["throttled_seconds"] += wait
+        if wait > 0:
+            logger.debug(f"Throttling {api} request for {wait:.2f}s")
+            pause(wait)
+
+    def record(self, api, metric):
+        with self._lock:
+            self.metrics[api][metric] += 1
+
+    def call(self, api, fn):
+        """Call `fn` under the quota for `api`, retrying retryable errors with backoff"""
+        for attempt in range(GOOGLE_API_MAX_RETRIES + 1):
+            breaker = circuit_breakers["docs" if api.startswith("docs") else "drive"]
+            breaker.check()
+            self.throttle(api)
+            try:
+                return run_cancellable(breaker.call, fn)
+            except HttpError as e:
+                if not google_retryable(e):
+                    self.record(api, "failed_requests")
+                    raise
+                self.record(api, "retryable_errors")
+                if attempt == GOOGLE_API_MAX_RETRIES:
+                    self.record(api, "failed_requests")
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{api} request failed with {e.resp.status}, retrying in {delay:.1f}s")
+                self.record(api, "retries")
+                pause(delay)
+
+    def snapshot(self):
+        """Metrics and available quota per API for get_server_stats"""
+        with self._lock:
+            return {
+                api: {
+                    **metrics,
+                    "throttled_seconds": round(metrics["throttled_seconds"], 3),
+                    "quota_per_minute": GOOGLE_API_QUOTAS[api],
+                    "tokens_available": round(max(0.0, self.buckets[api].tokens), 1)
+                }
+                for api, metrics in self.metrics.items()
+            }
+
+google_api_limiter = GoogleApiLimiter(GOOGLE_API_QUOTAS)
+
+# Drive metadata batching: up to 100 files().get calls per HTTP batch request
+DRIVE_BATCH_MAX_SIZE = 100  # Drive API limit for a single batch request
+DRIVE_BATCH_WINDOW_SECONDS = float(os.getenv("DRIVE_BATCH_WINDOW_SECONDS", "0.02"))
+DRIVE_METADATA_FIELDS = "id, name, mimeType, parents, modifiedTime, md5Checksum, size, webViewLink"
+
+class DriveMetadataBatcher:
+    """Coalesces Drive `files().get` metadata calls into HTTP batch requests.
+
+    Callers on any thread queue a request and wait on a Future. Queued calls are
+    sent together once 100 are pending or the short batching window elapses, and
+    each batch callback resolves the Future of the caller that asked for it. Batches
+    are sent from their own thread, so quota waits belong to the batch rather than to
+    whichever caller filled it, and every caller waits within its own deadline.
+    It serves lookups by file ID (get_drive_files_metadata). The folder and index
+    tools don't go through it: they read metadata from the Colab index, which gets
+    up to 1000 files per listing or changes page.
+    """
+
+    def __init__(self, service, window=DRIVE_BATCH_WINDOW_SECONDS):
+        self.service = service
+        self.window = window
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+        self.batches_sent = 0
+        self.requests_sent = 0
+
+    def submit(self, file_id, fields=DRIVE_METADATA_FIELDS):
+        """Queue a metadata request and return a Future for its result"""
+        future = Future()
+        self._enqueue(file_id, fields, future, 0)
+        return future
+
+    def _enqueue(self, file_id, fields, future, attempt):
+        batch = None
+        with self._lock:
+            self._pending.append((file_id, fields, future, attempt))
+            if len(self._pending) >= DRIVE_BATCH_MAX_SIZE:
+                batch = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(self._execute, batch)
+
+    @staticmethod
+    def _send(fn, *args):
+        # A new thread starts outside any tool call, so no single caller's deadline or cancellation applies
+        thread = threading.Thread(target=fn, args=args, name="drive-batch", daemon=True)
+        thread.start()
+
+    def get(self, file_id, fields=DRIVE_METADATA_FIELDS):
+        """Blocking single-file metadata lookup that shares a batch with concurrent callers"""
+        return wait_backend(self.submit(file_id, fields))
+
+    def get_many(self, file_ids, fields=DRIVE_METADATA_FIELDS):
+        """Metadata for many files; returns {file_id: metadata or Exception}"""
+        futures = {file_id: self.submit(file_id, fields) for file_id in file_ids}
+        self._send(self.flush)
+        results = {}
+        for file_id, future in futures.items():
+            try:
+                results[file_id] = wait_backend(future)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                results[file_id] = e
+        return results
+
+    def flush(self):
+        """Send everything queued so far without waiting for the batching window"""
+        while True:
+            with self._lock:
+                batch = self._take()
+            if not batch:
+                return
+            self._execute(batch)
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._pending[:DRIVE_BATCH_MAX_SIZE]
+        self._pending = self._pending[DRIVE_BATCH_MAX_SIZE:]
+        if self._pending:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return batch
+
+    def _execute(self, batch):
+        futures = {}
+
+        def callback(request_id, response, exception):
+            file_id, fields, future, attempt = futures[request_id]
+            if exception is None:
+                future.set_result(response)
+            elif google_retryable(exception) and attempt < GOOGLE_API_MAX_RETRIES:
+                # Send it again in a later batch once the backoff has passed
+                google_api_limiter.record("drive", "retryable_errors")
+                google_api_limiter.record("drive", "retries")
+                timer = threading.Timer(backoff_delay(attempt), self._enqueue, (file_id, fields, future, attempt + 1))
+                timer.daemon = True
+                timer.start()
+            else:
+                google_api_limiter.record("drive", "failed_requests")
+                future.set_exception(exception)
+
+        try:
+            http_batch = self.service.new_batch_http_request(callback=callback)
+            for i, (file_id, fields, future, attempt) in enumerate(batch):
+                futures[str(i)] = (file_id, fields, future, attempt)
+                request = self.service.files().get(fileId=file_id, fields=fields)
+                http_batch.add(request, request_id=str(i))
+            # Every request in a batch counts against the quota
+            google_api_limiter.throttle("drive", len(batch))
+            with request.pool.lend() as http:
+                circuit_breakers["drive"].call(http_batch.execute, http=http)
+            self.batches_sent += 1
+            self.requests_sent += len(batch)
+            logger.debug(f"Sent Drive metadata batch with {len(batch)} requests")
+        except BaseException as e:
+            logger.error(f"Drive metadata batch failed: {e}")
+            # Every caller in the batch is waiting on its Future, so none may be left unresolved
+            error = e if isinstance(e, Exception) else RuntimeError(f"Drive metadata batch aborted: {e!r}")
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+
+drive_batcher = DriveMetadataBatcher(drive_service) if drive_service else None
+
+# Per-session credentials: HTTP clients may act as themselves instead of the server's .env user
+SESSION_GOOGLE_TOKEN_HEADER = "x-google-token"  # base64 of an authorized-user token.json
+SESSION_GITHUB_TOKEN_HEADER = "x-github-token"
+REQUIRE_SESSION_CREDENTIALS = os.getenv("REQUIRE_SESSION_CREDENTIALS", "false").lower() == "true"
+CLIENT_POOL_MAX_ENTRIES = int(os.getenv("CLIENT_POOL_MAX_ENTRIES", "32"))
+CLIENT_POOL_IDLE_SECONDS = float(os.getenv("CLIENT_POOL_IDLE_SECONDS", "900"))
+
+_session_clients = contextvars.ContextVar("session_clients", default=None)
+
+class SessionClients:
+    """Backend clients built from one session's credentials.
+
+    A backend the session sent no credential for uses the server's client, unless
+    REQUIRE_SESSION_CREDENTIALS is set, in which case it is unavailable to the session.
+    """
+
+    def __init__(self, fingerprint, google_token, github_token):
+        self.fingerprint = fingerprint
+        self.created_at = self.last_used = time.monotonic()
+        self.calls = 0
+        fallback = not REQUIRE_SESSION_CREDENTIALS
+        if google_token:
+            creds = SerializedCredentials.from_authorized_user_info(json.loads(base64.b64decode(google_token)), GOOGLE_SCOPES)
+            google_token_refresher.register(creds)
+            http_pool = GoogleHttpPool(creds)
+            self.drive = build_google_service("drive", "v3", http_pool)
+            self.docs = build_google_service("docs", "v1", http_pool)
+            self.drive_batcher = DriveMetadataBatcher(self.drive)
+            self.colab_index = ColabIndex(os.path.join(GOOGLE_CREDENTIALS_DIR, f"colab_index_{fingerprint[:16]}.json"))
+        else:
+            self.drive = SessionBound.defaults["drive"] if fallback else None
+            self.docs = SessionBound.defaults["docs"] if fallback else None
+            self.drive_batcher = SessionBound.defaults["drive_batcher"] if fallback else None
+            self.colab_index = SessionBound.defaults["colab_index"]
+        if github_token:
+            auth = Auth.Token(github_token)
+            self.github = make_github_client(auth)
+            github_scheduler.set_label(f"{auth.token_type} {auth.token}", f"session-{fingerprint[:8]}")
+        else:
+            self.github = SessionBound.defaults["github"] if fallback else None
+
+class SessionBound:
+    """Stands in for a backend client and resolves to the calling session's one.
+
+    Tool code keeps using the module-level names (`drive_service`, `github_client`,
+    ...); each attribute access is forwarded to the client bound to the current call,
+    or to the server's own client outside a session.
+    """
+
+    defaults = {}
+
+    def __init__(self, attribute, default):
+        self._attribute = attribute
+        SessionBound.defaults[attribute] = default
+
+    def resolve(self):
+        clients = _session_clients.get()
+        if clients is None:
+            return SessionBound.defaults[self._attribute]
+        return getattr(clients, self._attribute)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __bool__(self):
+        return self.resolve() is not None
+
+class ClientPool:
+    """Warm SessionClients keyed by credential fingerprint.
+
+    Sessions presenting the same credentials share one set of clients, so discovery
+    documents and GitHub connections are built once per credential rather than per
+    call. The pool holds at most `max_entries` sets; sets idle for `idle_seconds`
+    are dropped on the next lookup, and the least recently used one is dropped when
+    the pool is full.
+    """
+
+    def __init__(self, max_entries, idle_seconds):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted_idle": 0, "evicted_lru": 0, "failed": 0}
+
+    def get(self, google_token, github_token):
+        fingerprint = hashlib.sha256(f"{google_token}\n{github_token}".encode()).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            for key, clients in list(self._entries.items()):
+                if now - clients.last_used > self.idle_seconds:
+                    del self._entries[key]
+                    self.stats["evicted_idle"] += 1
+            clients = self._entries.get(fingerprint)
+            if clients is not None:
+                self._entries.move_to_end(fingerprint)
+                clients.last_used = now
+                clients.calls += 1
+                self.stats["hits"] += 1
+                return clients
+            self.stats["misses"] += 1
+        # Build outside the lock so one slow credential doesn't hold up other sessions
+        try:
+            clients = SessionClients(fingerprint, google_token, github_token)
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        with self._lock:
+            clients = self._entries.setdefault(fingerprint, clients)
+            self._entries.move_to_end(fingerprint)
+            clients.calls += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted_lru"] += 1
+        return clients
+
+    def clients(self):
+        """Every pooled set of session clients"""
+        with self._lock:
+            return list(self._entries.values())
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            sessions = [
+                {
+                    "credential": clients.fingerprint[:8],
+                    "calls": clients.calls,
+                    "idle_seconds": round(now - clients.last_used, 1),
+                    "age_seconds": round(now - clients.created_at, 1)
+                }
+                for clients in self._entries.values()
+            ]
+            return {**self.stats, "size": len(sessions), "max_entries": self.max_entries, "credentials": sessions}
+
+client_pool = ClientPool(CLIENT_POOL_MAX_ENTRIES, CLIENT_POOL_IDLE_SECONDS)
+
+drive_service = SessionBound("drive", drive_service)
+docs_service = SessionBound("docs", docs_service)
+docs_drive_service = drive_service
+github_client = SessionBound("github", github_client)
+drive_batcher = SessionBound("drive_batcher", drive_batcher)
+colab_index = SessionBound("colab_index", colab_index)
+
+@contextmanager
+def session_credentials(ctx):
+    """Bind the clients for the credentials in the session's HTTP request headers.
+
+    stdio sessions, and HTTP requests without credential headers (unless
+    REQUIRE_SESSION_CREDENTIALS is set), use the server's own clients.
+    """
+    try:
+        request = ctx.request_context.request if ctx is not None else None
+    except ValueError:
+        request = None
+    headers = getattr(request, "headers", None)
+    google_token = headers.get(SESSION_GOOGLE_TOKEN_HEADER) if headers is not None else None
+    github_token = headers.get(SESSION_GITHUB_TOKEN_HEADER) if headers is not None else None
+    if not google_token and not github_token and not (REQUIRE_SESSION_CREDENTIALS and headers is not None):
+        yield
+        return
+    try:
+        clients = client_pool.get(google_token, github_token)
+    except Exception as e:
+        raise ValueError(f"Invalid session credentials: {e}") from e
+    token = _session_clients.set(clients)
+    try:
+        yield
+    finally:
+        _session_clients.reset(token)
+
+def session_fingerprint():
+    """Identifies the credentials the current call acts with"""
+    clients = _session_clients.get()
+    return clients.fingerprint if clients is not None else "server"
+
+def download_drive_file(file_id):
+    """Download a Drive file's raw bytes"""
+    request = drive_service.files().get_media(fileId=file_id)
+    file_stream = io.BytesIO()
+    # The downloader sends every chunk over request.http, so keep one borrowed transport for all of them
+    with request.pool.lend() as http:
+        request.http = http
+        downloader = MediaIoBaseDownload(file_stream, request)
+        done = False
+        while not done:
+            status, done = google_api_limiter.call("drive", downloader.next_chunk)
+    return file_stream.getvalue()
+
+# Shared budgets so concurrent tools don't exceed what the backends tolerate
+GEMINI_MAX_CONCURRENT_REQUESTS = worker_share(int(os.getenv("GEMINI_MAX_CONCURRENT_REQUESTS", "4")))
+GITHUB_MIN_REMAINING_REQUESTS = int(os.getenv("GITHUB_MIN_REMAINING_REQUESTS", "100"))
+gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENT_REQUESTS)
+
+# Gemini per-minute quotas (defaults are the free tier for gemini-2.5-flash; raise them for paid tiers)
+GEMINI_REQUESTS_PER_MINUTE = worker_share(int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "10")))
+GEMINI_TOKENS_PER_MINUTE = worker_share(int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000")))
+GEMINI_OUTPUT_TOKEN_ESTIMATE = 1024  # Expected response size, counted before the response is known
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable
+)
+
+def estimate_tokens(text):
+    """Rough token count for Gemini (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+class GeminiGovernor:
+    """Admits Gemini requests against per-minute request (RPM) and token (TPM) budgets.
+
+    Requests wait in arrival order until the last 60 seconds' usage leaves room for
+    them, so a burst from one batch can't starve requests queued before it. Each
+    request is counted with its estimated tokens until the response reports the
+    actual usage.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window = deque()  # [admitted_at, tokens] for requests sent in the last minute
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self.stats = {"admitted": 0, "queued": 0, "queued_seconds": 0.0, "retries": 0, "failed": 0}
+        self.usage = {}
+
+    def _wait_time(self, tokens, now):
+        """Seconds until a request of `tokens` fits both budgets (0 if it fits now)"""
+        while self._window and self._window[0][0] <= now - 60:
+            self._window.popleft()
+        wait = 0.0
+        if len(self._window) >= self.requests_per_minute:
+            wait = self._window[len(self._window) - self.requests_per_minute][0] + 60 - now
+        used = sum(entry[1] for entry in self._window)
+        # A request larger than the whole budget is let through once the window is empty
+        excess = used + min(tokens, self.tokens_per_minute) - self.tokens_per_minute
+        for admitted_at, entry_tokens in self._window:
+            if excess <= 0:
+                break
+            excess -= entry_tokens
+            wait = max(wait, admitted_at + 60 - now)
+        return wait
+
+    def admit(self, tokens):
+        """Wait for this request's turn and budget; returns its window entry"""
+        call = _current_call.get()
+        ticket = object()
+        queued_at = time.monotonic()
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    wait = CANCEL_POLL_SECONDS
+                    if self._queue[0] is ticket:
+                        now = time.monotonic()
+                        wait = self._wait_time(tokens, now)
+                        if wait <= 0:
+                            entry = [now, tokens]
+                            self._window.append(entry)
+                            break
+                        remaining = call.remaining() if call is not None else None
+                        if remaining is not None and wait > remaining:
+                            raise DeadlineExceeded(f"Gemini quota frees up in {wait:.0f}s, only {remaining:.0f}s left")
+                    self._condition.wait(min(wait, CANCEL_POLL_SECONDS))
+                    if call is not None:
+                        call.check()
+            finally:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+            queued_seconds = time.monotonic() - queued_at
+            self.stats["admitted"] += 1
+            if queued_seconds > CANCEL_POLL_SECONDS:
+                self.stats["queued"] += 1
+                self.stats["queued_seconds"] += queued_seconds
+        return entry
+
+    def _tool_usage(self, tool):
+        return self.usage.setdefault(tool, {
+            "requests": 0, "failed_requests": 0, "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0
+        })
+
+    def settle(self, entry, tool, usage_metadata):
+        """Record a response's actual token usage against the tool and the window"""
+        with self._condition:
+            usage = self._tool_usage(tool)
+            usage["requests"] += 1
+            if usage_metadata is not None:
+                entry[1] = usage_metadata.total_token_count
+                usage["prompt_tokens"] += usage_metadata.prompt_token_count
+                usage["output_tokens"] += usage_metadata.candidates_token_count or 0
+                usage["total_tokens"] += usage_metadata.total_token_count
+            else:
+                usage["total_tokens"] += entry[1]
+
+    def withdraw(self, entry):
+        """Give back the budget of an admitted request that was never sent"""
+        with self._condition:
+            for index, admitted in enumerate(self._window):
+                if admitted is entry:
+                    del self._window[index]
+                    break
+            self._condition.notify_all()
+
+    def record_failure(self, tool, retrying):
+        with self._condition:
+            self._tool_usage(tool)["failed_requests"] += 1
+            self.stats["retries" if retrying else "failed"] += 1
+
+    def snapshot(self):
+        """Budgets, queue and per-tool token consumption for get_server_stats"""
+        with self._condition:
+            now = time.monotonic()
+            recent = [entry for entry in self._window if entry[0] > now - 60]
+            return {
+                **self.stats,
+                "queued_seconds": round(self.stats["queued_seconds"], 3),
+                "waiting": len(self._queue),
+                "requests_last_minute": len(recent),
+                "tokens_last_minute": sum(entry[1] for entry in recent),
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "usage_by_tool": {tool: dict(usage) for tool, usage in self.usage.items()}
+            }
+
+gemini_governor = GeminiGovernor(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE)
+
+class CachedGeminiResponse:
+    """Stands in for a Gemini response served from the shared cache"""
+
+    usage_metadata = None
+
+    def __init__(self, text):
+        self.text = text
+
+def gemini_generate(prompt):
+    """Call Gemini within the shared concurrency, RPM and TPM budgets.
+
+    Rate-limit and server errors are retried with backoff. A cancelled caller stops
+    waiting at once; the concurrency slot is freed when the request ends. Responses
+    are cached by prompt, so a prompt answered by any worker isn't sent again.
+    """
+    tool_checkpoint()
+    cache_key = hashlib.sha256(f"{gemini_model.model_name}\n{prompt}".encode()).hexdigest()
+    cached = shared_cache.get("gemini", cache_key)
+    if cached is not None:
+        return CachedGeminiResponse(cached)
+    call = _current_call.get()
+    tool = call.name if call is not None else "direct"
+    estimated_tokens = estimate_tokens(prompt) + GEMINI_OUTPUT_TOKEN_ESTIMATE
+
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        circuit_breakers["gemini"].check()
+        entry = gemini_governor.admit(estimated_tokens)
+
+        def generate(request_options):
+            try:
+                return circuit_breakers["gemini"].call(
+                    gemini_model.generate_content, prompt, request_options=request_options,
+                    budget_seconds=request_options["timeout"] if request_options else None
+                )
+            finally:
+                gemini_slots.release()
+
+        # Until the request is handed to a backend thread, its slot and window entry are this thread's to give back
+        try:
+            acquire_cancellable(gemini_slots)
+            try:
+                remaining = time_remaining()
+                future = submit_backend(generate, {"timeout": remaining} if remaining is not None else None)
+            except BaseException:
+                gemini_slots.release()
+                raise
+        except BaseException:
+            gemini_governor.withdraw(entry)
+            raise
+
+        try:
+            response = wait_backend(future)
+        except GEMINI_RETRYABLE_ERRORS as e:
+            retrying = attempt < GEMINI_MAX_RETRIES
+            gemini_governor.record_failure(tool, retrying)
+            if not retrying:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Gemini request failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            pause(delay)
+            continue
+        gemini_governor.settle(entry, tool, getattr(response, "usage_metadata", None))
+        try:
+            text = response.text
+        except ValueError:
+            text = None  # Blocked or empty responses have no text and aren't cached
+        if text:
+            shared_cache.set("gemini", cache_key, text, ttl=GEMINI_CACHE_TTL_SECONDS)
+        return response
+
+def github_budget_exhausted():
+    """Whether the last seen GitHub rate limit is below the reserve kept for interactive calls"""
+    if not github_client:
+        return False
+    remaining = github_pool.best_remaining()
+    return remaining is not None and remaining < GITHUB_MIN_REMAINING_REQUESTS
+
+async def report_progress(ctx, progress, total=None, message=None):
+    """Send an MCP progress notification when the caller supplied a progress token"""
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress, total, message)
+    except ValueError:
+        # Called outside of an MCP request (e.g. directly from Python)
+        pass
+
+async def send_log(ctx, data, logger_name):
+    """Stream an intermediate result to the client as an MCP log notification"""
+    if ctx is None:
+        return
+    try:
+        await ctx.log("info", data, logger_name=logger_name)
+    except ValueError:
+        pass
 
 # Create the FastMCP server
 mcp = FastMCP(name="my-first-mcp-server")
 
-@mcp.tool()
+# Per-call state for tools running in worker threads
+_active_calls = set()
+_active_calls_lock = threading.Lock()
+# Every ToolCall not yet garbage collected, so a shutdown can stop calls between their worker runs too
+_open_calls = weakref.WeakSet()
+# Time the current worker sets aside for later stages of its call (e.g. a Gemini request after a
+# traversal); per worker, since the workers of one batch call share its ToolCall
+_reserved_seconds = contextvars.ContextVar("reserved_seconds", default=0.0)
+_cancellation_stats = {"cancelled_calls": 0, "abort_seconds_total": 0.0, "abort_seconds_max": 0.0}
+
+# Blocking backend calls run here so a cancelled caller can stop waiting on them
+BACKEND_MAX_WORKERS = int(os.getenv("BACKEND_MAX_WORKERS", "32"))
+_backend_executor = ThreadPoolExecutor(max_workers=BACKEND_MAX_WORKERS, thread_name_prefix="backend")
+CANCEL_POLL_SECONDS = 0.1
+
+# Default deadline per tool in seconds; override with TOOL_DEADLINE_<TOOL_NAME>=seconds
+TOOL_DEFAULT_DEADLINES = {
+    "ping": 5,
+    "get_server_stats": 5,
+    "get_backend_health": 5,
+    "list_colab_files": 30,
+    "refresh_colab_index": 120,
+    "get_drive_files_metadata": 60,
+    "read_colab_notebook": 60,
+    "generate_readme": 90,
+    "create_github_repo": 180,
+    "create_github_repos_from_drive_folder": 3600,
+    "list_github_repos": 60,
+    "read_github_repo_files": 120,
+    "analyze_github_repo_with_ai": 180,
+    "analyze_github_repos_batch": 1800,
+    "summarize_repo_analysis_for_resume": 60,
+    "list_google_docs": 30,
+    "create_google_doc": 60,
+    "add_to_google_doc": 60,
+    "add_repos_to_resume": 1800,
+}
+DEFAULT_TOOL_DEADLINE_SECONDS = float(os.getenv("DEFAULT_TOOL_DEADLINE_SECONDS", "120"))
+# Time a Gemini call needs to be worth starting; with less left, tools take their non-AI path
+GEMINI_MIN_SECONDS = float(os.getenv("GEMINI_MIN_SECONDS", "15"))
+# Extra time the MCP wrapper waits past the deadline for a partial result before giving up
+DEADLINE_GRACE_SECONDS = 2.0
+
+def tool_deadline(name, deadline_seconds=None):
+    """Deadline in seconds for a tool call: the caller's value, else the configured default"""
+    if deadline_seconds is not None and deadline_seconds > 0:
+        return float(deadline_seconds)
+    configured = os.getenv(f"TOOL_DEADLINE_{name.upper()}")
+    if configured:
+        return float(configured)
+    return float(TOOL_DEFAULT_DEADLINES.get(name, DEFAULT_TOOL_DEADLINE_SECONDS))
+
+class DeadlineExceeded(TimeoutError):
+    """A backend call could not finish within the tool call's remaining budget"""
+
+class ToolCancelled(BaseException):
+    """Raised inside a worker when its tool call was cancelled.
+
+    Derives from BaseException (like asyncio.CancelledError) so the tools' broad
+    `except Exception` handlers don't swallow it and keep working.
+    """
+
+class ToolCall:
+    """State of one MCP tool invocation, visible to the blocking code that serves it"""
+
+    def __init__(self, name, ctx=None, deadline_seconds=None, session=None):
+        self.name = name
+        self.ctx = ctx
+        self.priority = tool_priority(name)
+        self.session = session or session_key(ctx)
+        self.steps = 0
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + deadline_seconds if deadline_seconds is not None else None
+        self.cancel_reason = None
+        self.cancelled_at = None
+        self._cancelled = threading.Event()
+        self._workers = 0
+        self._lock = threading.Lock()
+        with _active_calls_lock:
+            _open_calls.add(self)
+
+    def progress(self, message, total=None):
+        """Report a phase of work as an MCP progress notification (call from the worker thread)"""
+        if self.ctx is None or self.cancelled:
+            return
+        with self._lock:
+            self.steps += 1
+            step = self.steps
+        try:
+            anyio.from_thread.run(report_progress, self.ctx, step, total, message)
+        except RuntimeError:
+            # Not running in an anyio worker thread, e.g. called directly from Python
+            pass
+        except Exception as e:
+            logger.debug(f"Could not send progress for {self.name}: {e}")
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """Seconds left before the deadline, or None when the call has no deadline"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def budget_low(self, reserve_seconds=0.0):
+        """Whether less than `reserve_seconds` is left beyond what the current worker reserved for later stages"""
+        return self.deadline is not None and self.remaining() < reserve_seconds + _reserved_seconds.get()
+
+    def cancel(self, reason="cancelled by client"):
+        """Ask the workers serving this call to stop at their next checkpoint"""
+        if not self._cancelled.is_set():
+            self.cancel_reason = reason
+            self.cancelled_at = time.monotonic()
+            self._cancelled.set()
+            logger.debug(f"Cancelling {self.name}: {reason}")
+
+    def check(self):
+        """Checkpoint: raise ToolCancelled if the call was cancelled"""
+        if self._cancelled.is_set():
+            raise ToolCancelled(f"{self.name} {self.cancel_reason}")
+
+    def enter(self):
+        with self._lock:
+            self._workers += 1
+            if self._workers == 1:
+                with _active_calls_lock:
+                    _active_calls.add(self)
+
+    def exit(self):
+        with self._lock:
+            self._workers -= 1
+            if self._workers:
+                return
+        with _active_calls_lock:
+            _active_calls.discard(self)
+        if self.cancelled_at is not None:
+            abort_seconds = time.monotonic() - self.cancelled_at
+            with _active_calls_lock:
+                _cancellation_stats["cancelled_calls"] += 1
+                _cancellation_stats["abort_seconds_total"] += abort_seconds
+                _cancellation_stats["abort_seconds_max"] = max(_cancellation_stats["abort_seconds_max"], abort_seconds)
+            logger.debug(f"{self.name} aborted {abort_seconds:.3f}s after cancellation")
+
+def tool_progress(message, total=None):
+    """Report progress for the tool call being served by the current thread, if any"""
+    call = _current_call.get()
+    if call is not None:
+        call.progress(message, total)
+
+def time_remaining():
+    """Seconds left for the current tool call, or None when there is no deadline"""
+    call = _current_call.get()
+    return call.remaining() if call is not None else None
+
+def budget_low(reserve_seconds=0.0):
+    """Whether the current tool call has less than `reserve_seconds` left beyond what later stages reserved"""
+    call = _current_call.get()
+    return call is not None and call.budget_low(reserve_seconds)
+
+@contextmanager
+def reserve_budget(seconds):
+    """Set aside `seconds` of the current call's budget for a later stage while the block runs.
+
+    The reservation belongs to the current worker: other workers of the same call
+    (e.g. the items of a batch) don't see it.
+    """
+    token = _reserved_seconds.set(_reserved_seconds.get() + seconds)
+    try:
+        yield
+    finally:
+        _reserved_seconds.reset(token)
+
+def tool_checkpoint():
+    """Stop the current tool call here if it has been cancelled"""
+    call = _current_call.get()
+    if call is not None:
+        call.check()
+
+# Priority scheduling: worker slots go to latency-sensitive tools first and are shared fairly between sessions
+PRIORITY_CLASSES = ("interactive", "standard", "bulk")
+# Most of the slots each class may hold at once, so bulk work always leaves slots free for interactive calls
+PRIORITY_CLASS_SHARES = {
+    priority: float(os.getenv(f"PRIORITY_SHARE_{priority.upper()}", share))
+    for priority, share in (("interactive", "1.0"), ("standard", "0.9"), ("bulk", "0.75"))
+}
+# Tools not listed are "standard"; override with TOOL_PRIORITY_<TOOL_NAME>=interactive|standard|bulk
+TOOL_PRIORITIES = {
+    "ping": "interactive",
+    "get_server_stats": "interactive",
+    "get_backend_health": "interactive",
+    "list_colab_files": "interactive",
+    "list_google_docs": "interactive",
+    "list_github_repos": "interactive",
+    "get_drive_files_metadata": "interactive",
+    "refresh_colab_index": "bulk",
+    "create_github_repos_from_drive_folder": "bulk",
+    "analyze_github_repos_batch": "bulk",
+    "add_repos_to_resume": "bulk",
+}
+TOOL_WORKER_SLOTS = int(os.getenv("TOOL_WORKER_SLOTS", "32"))
+# Threads that may wait for a tool worker slot; waiting is cheap, so this is well above the slot count
+TOOL_MAX_THREADS = int(os.getenv("TOOL_MAX_THREADS", "256"))
+PRIORITY_WAIT_SAMPLES = 1000
+
+def tool_priority(name):
+    """Priority class of a tool: the configured override, else TOOL_PRIORITIES, else standard"""
+    configured = os.getenv(f"TOOL_PRIORITY_{name.upper()}")
+    priority = configured.lower() if configured else TOOL_PRIORITIES.get(name, "standard")
+    return priority if priority in PRIORITY_CLASSES else "standard"
+
+def session_key(ctx):
+    """Identifies the client a call came from, so scheduling can be fair between clients"""
+    if ctx is None:
+        return "local"
+    try:
+        request = ctx.request_context.request
+    except ValueError:
+        return "local"
+    if request is not None:
+        # Stateless HTTP has no session ID; the client's address stands in for it
+        session_id = request.headers.get("mcp-session-id")
+        if session_id:
+            return session_id
+        if request.client is not None:
+            return f"client-{request.client.host}"
+    return f"session-{id(ctx.session)}"
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+class PriorityScheduler:
+    """Hands out a fixed number of worker slots by priority class, fairly across sessions.
+
+    A free slot goes to the highest waiting class that is below its share of the
+    slots. Running work can't be preempted, so the shares are what keep slots free
+    for interactive calls while bulk work runs. Within a class, sessions are served
+    by start-time fair queuing: a waiting request is tagged one past the later of
+    its session's previous tag and the class's virtual time, so one session queueing
+    a hundred items doesn't put another session's single call behind all of them.
+    """
+
+    def __init__(self, name, slots):
+        self.name = name
+        self.slots = slots
+        self.limits = {p: max(1, math.floor(slots * PRIORITY_CLASS_SHARES[p])) for p in PRIORITY_CLASSES}
+        self.running = {p: 0 for p in PRIORITY_CLASSES}
+        self._queues = {p: [] for p in PRIORITY_CLASSES}
+        self._virtual_time = {p: 0 for p in PRIORITY_CLASSES}
+        self._session_tags = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._waits = {p: deque(maxlen=PRIORITY_WAIT_SAMPLES) for p in PRIORITY_CLASSES}
+        self.stats = {p: {"granted": 0, "waited": 0} for p in PRIORITY_CLASSES}
+
+    def _dispatch(self):
+        """Grant free slots to waiters, highest class first; call with the lock held"""
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue and sum(self.running.values()) < self.slots and self.running[priority] < self.limits[priority]:
+                tag, _, waiter = heapq.heappop(queue)
+                if waiter["abandoned"]:
+                    continue
+                self._virtual_time[priority] = tag
+                self.running[priority] += 1
+                waiter["granted"].set()
+
+    def acquire(self, priority, session, call=None):
+        """Wait for a slot, giving up if `call` is cancelled (ToolCancelled) or runs out of time (DeadlineExceeded)"""
+        queued_at = time.monotonic()
+        waiter = {"granted": threading.Event(), "abandoned": False}
+        with self._lock:
+            key = (priority, session)
+            tag = max(self._virtual_time[priority], self._session_tags.get(key, 0)) + 1
+            self._session_tags[key] = tag
+            if len(self._session_tags) > 10000:
+                # Tags at or below the virtual time no longer affect anyone's place in the queue
+                self._session_tags = {k: t for k, t in self._session_tags.items() if t > self._virtual_time[k[0]]}
+            self._sequence += 1
+            heapq.heappush(self._queues[priority], (tag, self._sequence, waiter))
+            self._dispatch()
+        while not waiter["granted"].wait(CANCEL_POLL_SECONDS):
+            if call is None:
+                continue
+            try:
+                call.check()
+                if call.remaining() == 0:
+                    raise DeadlineExceeded(f"{call.name} deadline exceeded while waiting for a {self.name} slot")
+            except BaseException:
+                with self._lock:
+                    waiter["abandoned"] = True
+                    granted = waiter["granted"].is_set()
+                if granted:
+                    self.release(priority)
+                raise
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            self.stats[priority]["granted"] += 1
+            if waited >= CANCEL_POLL_SECONDS:
+                self.stats[priority]["waited"] += 1
+            self._waits[priority].append(waited)
+
+    def release(self, priority):
+        with self._lock:
+            self.running[priority] -= 1
+            self._dispatch()
+
+    def snapshot(self):
+        with self._lock:
+            classes = {}
+            for priority in PRIORITY_CLASSES:
+                waits = list(self._waits[priority])
+                classes[priority] = {
+                    **self.stats[priority],
+                    "running": self.running[priority],
+                    "limit": self.limits[priority],
+                    "queued": sum(1 for _, _, waiter in self._queues[priority] if not waiter["abandoned"]),
+                    "wait_ms_p50": round(percentile(waits, 0.5) * 1000, 1) if waits else None,
+                    "wait_ms_p99": round(percentile(waits, 0.99) * 1000, 1) if waits else None
+                }
+            return {"slots": self.slots, "classes": classes}
+
+# Slots for running tool code, and for the backend requests it makes
+tool_scheduler = PriorityScheduler("tool worker", TOOL_WORKER_SLOTS)
+backend_scheduler = PriorityScheduler("backend", BACKEND_MAX_WORKERS)
+_tool_threads = anyio.CapacityLimiter(TOOL_MAX_THREADS)
+
+def run_cancellable(fn, *args, **kwargs):
+    """Run a blocking backend call within the current tool call's cancellation and deadline.
+
+    The backend call itself cannot be interrupted, but the worker serving the tool
+    stops waiting when the call is cancelled (ToolCancelled) or its deadline passes
+    (DeadlineExceeded), and the backend's result is discarded. Backend threads are
+    handed out by backend_scheduler, so interactive calls don't queue behind bulk work.
+    """
+    return wait_backend(submit_backend(fn, *args, **kwargs))
+
+def submit_backend(fn, *args, **kwargs):
+    """Hand a blocking backend call to a backend thread once the current tool call gets a backend slot.
+
+    Returns its Future. Raises ToolCancelled or DeadlineExceeded, with `fn` never
+    started, if the call is cancelled or out of time first. Outside a tool call `fn`
+    runs here and the Future is already done.
+    """
+    call = _current_call.get()
+    if call is None:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+    if call.remaining() == 0:
+        raise DeadlineExceeded(f"{call.name} deadline exceeded")
+    backend_scheduler.acquire(call.priority, call.session, call)
+    try:
+        future = _backend_executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    except BaseException:
+        backend_scheduler.release(call.priority)
+        raise
+    # The slot stays taken until the backend call really ends, even if this caller stops waiting
+    future.add_done_callback(lambda _: backend_scheduler.release(call.priority))
+    return future
+
+def wait_backend(future):
+    """The result of a submitted backend call, waiting within the current tool call's cancellation and deadline"""
+    call = _current_call.get()
+    if call is None:
+        return future.result()
+    while True:
+        remaining = call.remaining()
+        timeout = CANCEL_POLL_SECONDS if remaining is None else min(CANCEL_POLL_SECONDS, remaining)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # FutureTimeoutError is the builtin TimeoutError, so the backend call's own timeout lands here too
+            if future.done():
+                raise
+            call.check()
+            if call.remaining() == 0:
+                raise DeadlineExceeded(f"{call.name} deadline exceeded while waiting on a backend call")
+
+def google_execute(request):
+    """Execute a Drive/Docs API request under the shared quota and the current tool call's deadline.
+
+    Rate limit and server errors are retried with exponential backoff and jitter.
+    """
+    return google_api_limiter.call(google_api_limiter.api_for(request), request.execute)
+
+def acquire_cancellable(semaphore):
+    """Acquire a semaphore, giving up if the current tool call is cancelled while waiting"""
+    call = _current_call.get()
+    while not semaphore.acquire(timeout=CANCEL_POLL_SECONDS):
+        if call is not None:
+            call.check()
+
+def pause(seconds):
+    """Sleep on behalf of the current tool call, waking early if it is cancelled.
+
+    Raises DeadlineExceeded straight away when the pause would outlast the call's deadline.
+    """
+    call = _current_call.get()
+    if call is None:
+        time.sleep(seconds)
+        return
+    remaining = call.remaining()
+    if remaining is not None and seconds > remaining:
+        raise DeadlineExceeded(f"{call.name} would have to wait {seconds:.0f}s, only {remaining:.0f}s left")
+    if call._cancelled.wait(seconds):
+        call.check()
+
+async def run_in_worker(call, fn, *args, limiter=None, **kwargs):
+    """Run blocking tool code in a worker thread on behalf of `call`.
+
+    If the awaiting task is cancelled (e.g. the client sent notifications/cancelled),
+    the wait is abandoned at once and the call is flagged so the worker stops at its
+    next checkpoint instead of finishing work nobody will read. The code runs once
+    tool_scheduler grants the call a slot by its priority class and session.
+    """
+    def run():
+        token = _current_call.set(call)
+        call.enter()
+        try:
+            try:
+                tool_scheduler.acquire(call.priority, call.session, call)
+            except DeadlineExceeded as e:
+                return {"error": str(e)}
+            try:
+                call.check()
+                return fn(*args, **kwargs)
+            finally:
+                tool_scheduler.release(call.priority)
+        except ToolCancelled as e:
+            logger.debug(f"Worker stopped: {e}")
+            return {"error": str(e)}
+        finally:
+            call.exit()
+            _current_call.reset(token)
+
+    try:
+        return await anyio.to_thread.run_sync(run, abandon_on_cancel=True, limiter=limiter or _tool_threads)
+    except anyio.get_cancelled_exc_class():
+        call.cancel("deadline exceeded" if call.remaining() == 0 else "cancelled by client")
+        raise
+
+# Admission control: calls beyond these ceilings are turned away at once instead of queueing
+MAX_IN_FLIGHT_CALLS = int(os.getenv("MAX_IN_FLIGHT_CALLS", "32"))
+DEFAULT_TOOL_CONCURRENCY = 16
+# Per-tool ceilings for the expensive tools; override with TOOL_CONCURRENCY_<TOOL_NAME>=n
+TOOL_CONCURRENCY_LIMITS = {
+    "read_colab_notebook": 8,
+    "generate_readme": 4,
+    "create_github_repo": 4,
+    "create_github_repos_from_drive_folder": 2,
+    "read_github_repo_files": 16,
+    "analyze_github_repo_with_ai": 8,
+    "analyze_github_repos_batch": 2,
+    "summarize_repo_analysis_for_resume": 8,
+    "add_repos_to_resume": 2,
+}
+# Cheap tools that are always admitted and don't count against the global cap
+ALWAYS_ADMITTED_TOOLS = {"ping", "get_server_stats", "get_backend_health", "list_google_docs"}
+
+class ServerBusy(Exception):
+    """A tool call was turned away by admission control"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def response(self):
+        return {"error": str(self), "busy": True, "retry_after_seconds": self.retry_after}
+
+class AdmissionController:
+    """Per-tool concurrency ceilings plus a global cap on in-flight tool calls.
+
+    Calls over a limit fail fast with ServerBusy and a retry-after hint derived from
+    how long recent calls of that tool took.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT_CALLS):
+        self.max_in_flight = max_in_flight
+        self.in_flight_total = 0
+        self.in_flight = {}
+        self._durations = {}
+        self._lock = threading.Lock()
+        self.draining = False
+        self.stats = {"admitted": 0, "rejected": 0, "rejected_by_tool": {}, "rejected_draining": 0}
+
+    @staticmethod
+    def limit(tool):
+        configured = os.getenv(f"TOOL_CONCURRENCY_{tool.upper()}")
+        return int(configured) if configured else TOOL_CONCURRENCY_LIMITS.get(tool, DEFAULT_TOOL_CONCURRENCY)
+
+    def _retry_after(self, tool, slots):
+        # With all slots busy, one frees up roughly every (typical duration / slots) seconds
+        duration = self._durations.get(tool, 5.0)
+        return max(1, math.ceil(duration / max(1, slots)))
+
+    def acquire(self, tool):
+        """Admit a call of `tool` or raise ServerBusy; returns the admission time for release()"""
+        with self._lock:
+            if tool not in ALWAYS_ADMITTED_TOOLS:
+                if self.draining:
+                    self.stats["rejected_draining"] += 1
+                    raise ServerBusy("Server is shutting down, retry the call on another instance", 1)
+                busy = None
+                if self.in_flight_total >= self.max_in_flight:
+                    typical = sum(self._durations.values()) / len(self._durations) if self._durations else 5.0
+                    retry_after = max(1, math.ceil(typical / max(1, self.max_in_flight)))
+                    busy = f"Server busy: {self.in_flight_total} calls in flight, retry after {retry_after} s"
+                elif self.in_flight.get(tool, 0) >= self.limit(tool):
+                    retry_after = self._retry_after(tool, self.limit(tool))
+                    busy = f"Server busy: {tool} is at its limit of {self.limit(tool)} concurrent calls, retry after {retry_after} s"
+                if busy:
+                    self.stats["rejected"] += 1
+                    self.stats["rejected_by_tool"][tool] = self.stats["rejected_by_tool"].get(tool, 0) + 1
+                    logger.warning(busy)
+                    raise ServerBusy(busy, retry_after)
+                self.in_flight_total += 1
+            self.in_flight[tool] = self.in_flight.get(tool, 0) + 1
+            self.stats["admitted"] += 1
+        return time.monotonic()
+
+    def release(self, tool, admitted_at):
+        duration = time.monotonic() - admitted_at
+        with self._lock:
+            if tool not in ALWAYS_ADMITTED_TOOLS:
+                self.in_flight_total -= 1
+            self.in_flight[tool] -= 1
+            previous = self._durations.get(tool)
+            self._durations[tool] = duration if previous is None else 0.8 * previous + 0.2 * duration
+
+    def start_draining(self):
+        """Turn away every new call except the always-admitted ones"""
+        with self._lock:
+            self.draining = True
+
+    def in_flight_calls(self):
+        """Admitted calls of any tool that have not finished yet"""
+        with self._lock:
+            return sum(self.in_flight.values())
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "draining": self.draining,
+                "rejected_by_tool": dict(self.stats["rejected_by_tool"]),
+                "in_flight_total": self.in_flight_total,
+                "max_in_flight": self.max_in_flight,
+                "in_flight_by_tool": {tool: n for tool, n in self.in_flight.items() if n}
+            }
+
+admission_control = AdmissionController()
+
+def admission_controlled(fn):
+    """Apply admission control to an async tool registered directly with @mcp.tool()"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            admitted_at = admission_control.acquire(fn.__name__)
+        except ServerBusy as e:
+            return e.response()
+        try:
+            with session_credentials(kwargs.get("ctx")):
+                return await fn(*args, **kwargs)
+        finally:
+            admission_control.release(fn.__name__, admitted_at)
+    return wrapper
+
+def managed_tool():
+    """Register a blocking tool that runs in a worker thread and can report progress.
+
+    The MCP-facing wrapper is async and receives the request Context, while the
+    decorated function is returned unchanged so other tools can keep calling it
+    directly. Client cancellation stops the worker at its next checkpoint, and every
+    tool gains an optional `deadline_seconds` argument (default from
+    TOOL_DEFAULT_DEADLINES) that bounds its backend calls. Calls are subject to
+    admission control, and large results are encoded to JSON in the CPU pool.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def run_tool(**kwargs):
+            # FastMCP sends a str result as-is, so a large one is encoded in the CPU pool, not on the event loop
+            return cpu_pool.encode_result(fn(**kwargs))
+
+        async def wrapper(ctx: Context = None, deadline_seconds: Optional[float] = None, **kwargs):
+            try:
+                admitted_at = admission_control.acquire(fn.__name__)
+            except ServerBusy as e:
+                return e.response()
+            try:
+                deadline = tool_deadline(fn.__name__, deadline_seconds)
+                call = ToolCall(fn.__name__, ctx, deadline)
+                # Stages degrade as the budget runs low; this is the backstop if one doesn't return
+                with anyio.move_on_after(deadline + DEADLINE_GRACE_SECONDS) as scope, session_credentials(ctx):
+                    return await run_in_worker(call, run_tool, **kwargs)
+                if scope.cancelled_caught:
+                    call.cancel("deadline exceeded")
+                    logger.warning(f"{fn.__name__} exceeded its {deadline:.0f}s deadline")
+                    return {"error": f"{fn.__name__} did not finish within its {deadline:.0f}s deadline"}
+            finally:
+                admission_control.release(fn.__name__, admitted_at)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("deadline_seconds", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[float]),
+            inspect.Parameter("ctx", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Context)
+        ])
+        wrapper.__annotations__ = {**fn.__annotations__, "deadline_seconds": Optional[float], "ctx": Context}
+        mcp.add_tool(wrapper, name=fn.__name__, description=fn.__doc__)
+        return fn
+    return decorator
+
+class SharedCall(ToolCall):
+    """One execution of a deduplicated call, shared by every caller that asked for it.
+
+    Runs on the first caller's worker thread, with a deadline covering the
+    longest-waiting caller. Its checkpoints look at the shared call, not that caller,
+    so it keeps going for the others if the first caller is cancelled; it is
+    cancelled once every caller has been. Progress is buffered and each caller
+    forwards it to its own client.
+    """
+
+    def __init__(self, name, key, deadline_seconds=None, session=None):
+        super().__init__(name, deadline_seconds=deadline_seconds, session=session)
+        self.key = key
+        self.future = Future()
+        self.callers = []
+        self.messages = []
+
+    @property
+    def waiters(self):
+        return len(self.callers)
+
+    def progress(self, message, total=None):
+        self.messages.append((message, total))
+
+    def extend_deadline(self, seconds):
+        """Make sure the shared execution can run for `seconds` more (None: no deadline)"""
+        if seconds is None:
+            self.deadline = None
+        elif self.deadline is not None:
+            self.deadline = max(self.deadline, time.monotonic() + seconds)
+
+    def check(self):
+        if not self._cancelled.is_set():
+            with _single_flight_lock:
+                abandoned = all(caller is not None and caller.cancelled for caller in self.callers)
+            if abandoned:
+                self.cancel("abandoned by every caller")
+        super().check()
+
+    def run(self, fn, args, kwargs):
+        token = _current_call.set(self)
+        # The first caller's reservations are already taken off the shared deadline
+        reserved = _reserved_seconds.set(0.0)
+        self.enter()
+        try:
+            self.future.set_result(fn(*args, **kwargs))
+        except ToolCancelled as e:
+            self.future.set_result({"error": str(e)})
+        except BaseException as e:
+            self.future.set_exception(e)
+        finally:
+            self.exit()
+            _reserved_seconds.reset(reserved)
+            _current_call.reset(token)
+            with _single_flight_lock:
+                if _single_flight_calls.get(self.key) is self:
+                    del _single_flight_calls[self.key]
+
+    def wait(self, caller):
+        """Wait for the shared result on behalf of `caller`, within its cancellation and deadline"""
+        forwarded = 0
+        while True:
+            try:
+                result = self.future.result(timeout=CANCEL_POLL_SECONDS)
+                break
+            except FutureTimeoutError:
+                if self.future.done():
+                    raise  # The execution itself raised a TimeoutError
+            finally:
+                if caller is not None:
+                    while forwarded < len(self.messages):
+                        caller.progress(*self.messages[forwarded])
+                        forwarded += 1
+            if caller is not None:
+                caller.check()
+                if caller.remaining() == 0:
+                    raise DeadlineExceeded(f"{caller.name} deadline exceeded while waiting on a shared {self.name} call")
+        # Every caller gets its own copy so none can change what the others see
+        return copy.deepcopy(result)
+
+_single_flight_calls = {}
+_single_flight_lock = threading.Lock()
+_single_flight_stats = {"executions": 0, "deduplicated_calls": 0}
+
+def single_flight(normalize, echo=None):
+    """Collapse identical concurrent calls of a blocking tool onto one execution.
+
+    `normalize` receives the bound arguments (defaults applied) and returns the
+    hashable part of the key; calls with the same tool name and key that overlap in
+    time share a single execution and its result. `echo(result, **arguments)`, if
+    given, puts each caller's own spelling of the arguments back into its copy.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # Sessions acting with different credentials may see different data, so never share across them
+            key = (fn.__name__, session_fingerprint(), normalize(**bound.arguments))
+            caller = _current_call.get()
+            # Time the caller can give the execution, minus what it keeps back for later stages
+            budget = None
+            if caller is not None and caller.deadline is not None:
+                budget = max(0.0, caller.remaining() - _reserved_seconds.get())
+            with _single_flight_lock:
+                shared = _single_flight_calls.get(key)
+                start = shared is None or shared.cancelled
+                if start:
+                    shared = SharedCall(fn.__name__, key, budget, session=caller.session if caller is not None else None)
+                    _single_flight_calls[key] = shared
+                    _single_flight_stats["executions"] += 1
+                else:
+                    shared.extend_deadline(budget)
+                    _single_flight_stats["deduplicated_calls"] += 1
+                    logger.debug(f"Joining in-flight {fn.__name__} call for {key[2]}")
+                shared.callers.append(caller)
+            try:
+                if start:
+                    # On this worker, so the execution counts against the limits of the call that started it
+                    shared.run(fn, bound.args, bound.kwargs)
+                result = shared.wait(caller)
+                return echo(result, **bound.arguments) if echo else result
+            finally:
+                with _single_flight_lock:
+                    shared.callers.remove(caller)
+                    if not shared.callers and not shared.future.done():
+                        shared.cancel("abandoned by every caller")
+        return wrapper
+    return decorator
+
+@managed_tool()
 def ping():
     """Test server connectivity"""
     logger.debug("Ping tool called")
     return {"status": "pong"}
 
-@mcp.tool()
-def list_colab_files(folder_id: Optional[str] = None):
-    """List Google Colab notebook files (.ipynb) in a Google Drive folder. If folder_id is None, search entire Drive."""
+@managed_tool()
+def get_server_stats():
+    """Report in-flight tool calls and server-side runtime statistics"""
+    logger.debug("Server stats tool called")
+    now = time.monotonic()
+    with _active_calls_lock:
+        in_flight = [
+            {
+                "tool": call.name,
+                "running_seconds": round(now - call.started_at, 3),
+                "cancelled": call.cancelled
+            }
+            for call in _active_calls
+        ]
+        cancellation = dict(_cancellation_stats)
+    with _single_flight_lock:
+        single_flight_stats = dict(_single_flight_stats)
+        single_flight_stats["in_flight"] = [
+            {"tool": shared.name, "arguments": repr(shared.key[2]), "waiters": shared.waiters}
+            for shared in _single_flight_calls.values()
+        ]
+    if cancellation["cancelled_calls"]:
+        cancellation["abort_seconds_avg"] = cancellation["abort_seconds_total"] / cancellation["cancelled_calls"]
+    return {
+        "in_flight_calls": in_flight,
+        "cancellation": cancellation,
+        "single_flight": single_flight_stats,
+        "github_rate_limit": github_scheduler.snapshot(),
+        "github_tokens": github_pool.snapshot(),
+        "google_api": google_api_limiter.snapshot(),
+        "gemini": gemini_governor.snapshot(),
+        "admission": admission_control.snapshot(),
+        "scheduling": {"tool_workers": tool_scheduler.snapshot(), "backend": backend_scheduler.snapshot()},
+        "shared_cache": shared_cache.snapshot(),
+        "cpu_pool": cpu_pool.snapshot(),
+        "session_clients": client_pool.snapshot(),
+        "google_auth": google_token_refresher.snapshot(),
+        "google_http": [pool.snapshot() for pool in list(google_http_pools)],
+        "github_http": github_http.snapshot()
+    }
+
+@managed_tool()
+def get_backend_health():
+    """Report each backend's circuit breaker state (closed, open or half_open), failure counts and latest backend probe"""
+    logger.debug("Backend health tool called")
+    configured = {
+        "github": bool(github_client),
+        "gemini": gemini_model is not None,
+        "drive": bool(drive_service),
+        "docs": bool(docs_service)
+    }
+    # Leave time to answer, so a hanging backend is reported down rather than timing out this tool
+    call = _current_call.get()
+    remaining = call.remaining() if call is not None else None
+    health_monitor.probe_if_idle(HEALTH_PROBE_TIMEOUT_SECONDS if remaining is None else max(0.0, remaining - HEALTH_TOOL_MARGIN_SECONDS))
+    readiness = health_monitor.snapshot()
+    backends = {
+        name: {"configured": configured[name], **breaker.snapshot(), "probe": readiness["backends"][name]}
+        for name, breaker in circuit_breakers.items()
+    }
+    healthy = all(
+        b["state"] == "closed" and b["probe"]["status"] != "down" for b in backends.values() if b["configured"]
+    )
+    return {"status": "ok" if healthy else "degraded", "ready": readiness["ready"], "backends": backends}
+
+@managed_tool()
+def list_colab_files(folder_id: Optional[str] = None, max_results: int = 30):
+    """List Google Colab notebook files (.ipynb) in a Google Drive folder. If folder_id is None, search entire Drive.
+
+    Answers come from the local Colab index, which is kept current from the Drive Changes API.
+    """
     logger.debug(f"Listing Colab files, folder_id: {folder_id}")
     try:
-        query = "mimeType='application/vnd.google.colaboratory' and trashed=false"
-        if folder_id:
-            query += f" and '{folder_id}' in parents"
-        
-        results = drive_service.files().list(
-            q=query,
-            fields="files(id, name, mimeType, webViewLink)",
-            pageSize=30
-        ).execute()
-        
-        files = results.get("files", [])
+        try:
+            colab_index.sync(drive_service)
+        except BackendUnavailable as e:
+            # Answer from the last synced index while Drive is unavailable
+            logger.warning(f"Listing Colab files from the cached index: {e}")
+        files = colab_index.list(folder_id)[:max_results]
         logger.debug(f"Found {len(files)} Colab files")
-        return [{"id": f["id"], "name": f["name"], "link": f["webViewLink"]} for f in files]
+        return [{"id": f["id"], "name": f["name"], "link": f["link"], "modified_time": f["modifiedTime"]} for f in files]
     except Exception as e:
         logger.error(f"Error in list_colab_files: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+@managed_tool()
+def refresh_colab_index(full_rebuild: bool = False):
+    """Bring the local Colab notebook index up to date.
+
+    Args:
+        full_rebuild: Discard the index and rebuild it from a full Drive listing instead of replaying changes. Default: False
+    """
+    logger.debug(f"Refreshing Colab index, full_rebuild: {full_rebuild}")
+    try:
+        if full_rebuild:
+            colab_index.rebuild(drive_service)
+        else:
+            colab_index.sync(drive_service, force=True)
+        return {"success": True, **colab_index.status()}
+    except Exception as e:
+        logger.error(f"Error in refresh_colab_index: {e}")
+        return {"error": str(e)}
+
+@managed_tool()
+def get_drive_files_metadata(file_ids: list[str]):
+    """Fetch Drive metadata for many files at once using batched requests (100 per HTTP call).
+
+    Args:
+        file_ids: Google Drive file IDs to look up
+    """
+    logger.debug(f"Fetching Drive metadata for {len(file_ids)} files")
+    
+    if not drive_batcher:
+        return {"error": "Google Drive API not configured. Please check your credentials and permissions."}
+    
+    try:
+        results = drive_batcher.get_many(file_ids)
+        files = {}
+        errors = {}
+        for file_id, result in results.items():
+            if isinstance(result, Exception):
+                errors[file_id] = str(result)
+            else:
+                files[file_id] = result
+        logger.debug(f"Fetched metadata for {len(files)} files, {len(errors)} errors")
+        return {"files": files, "errors": errors, "count": len(files)}
+    except Exception as e:
+        logger.error(f"Error in get_drive_files_metadata: {e}")
+        return {"error": str(e)}
+
+@managed_tool()
 def read_colab_notebook(file_id: str):
     """Read the content of a Google Colab notebook by file ID and return its metadata and cells."""
     logger.debug(f"Reading Colab notebook, file_id: {file_id}")
     try:
-        # Download the .ipynb file
-        request = drive_service.files().get_media(fileId=file_id)
-        file_stream = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_stream, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-        
-        # Parse the .ipynb content
-        file_stream.seek(0)
-        notebook_content = json.load(file_stream)
-        
-        # Extract basic metadata and cells
-        metadata = {
-            "name": notebook_content.get("metadata", {}).get("colab", {}).get("name", "Unknown"),
-            "cell_count": len(notebook_content.get("cells", []))
-        }
-        cells = [
-            {
-                "cell_type": cell.get("cell_type"),
-                "source": "".join(cell.get("source", [])) if cell.get("source") else ""
-            }
-            for cell in notebook_content.get("cells", [])
-        ]
+        # Skip the download and parse when the indexed md5 matches the cached copy
+        try:
+            colab_index.sync(drive_service)
+        except Exception as e:
+            logger.warning(f"Could not refresh Colab index: {e}")
+        entry = colab_index.get(file_id)
+        md5 = entry.get("md5") if entry else None
+        cached = shared_cache.get("notebook", file_id) if md5 else None
+        if cached and cached["md5"] == md5:
+            logger.debug(f"Using cached notebook for {file_id} (md5 unchanged)")
+            return cached["result"]
         
+        # Download the .ipynb content and extract basic metadata and cells; large notebooks are parsed in the CPU pool
+        raw = download_drive_file(file_id)
+        result = cpu_pool.parse_notebook(raw)
+        metadata = result["metadata"]
+
         logger.debug(f"Read notebook: {metadata['name']} with {metadata['cell_count']} cells")
-        return {"metadata": metadata, "cells": cells}
+        if md5:
+            # Cache under the md5 of what was downloaded (Drive's md5Checksum is of the content), not the
+            # indexed one: the notebook may have been edited since the index saw it
+            shared_cache.set(
+                "notebook", file_id, {"md5": hashlib.md5(raw).hexdigest(), "result": result},
+                max_entries=NOTEBOOK_CACHE_MAX_ENTRIES
+            )
+        return result
     except Exception as e:
         logger.error(f"Error in read_colab_notebook: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+@managed_tool()
 def generate_readme(file_id: str, file_name: str):
     """Generate a comprehensive README.md string for a Colab notebook using AI analysis of its content."""
     logger.debug(f"Generating README for file_id: {file_id}, file_name: {file_name}")
     try:
         # Read notebook content
+        tool_progress(f"Reading notebook {file_name}")
         notebook_data = read_colab_notebook(file_id)
         if "error" in notebook_data:
             return {"error": notebook_data["error"]}
@@ -168,17 +2988,24 @@ def generate_readme(file_id: str, file_name: str):
         # Use file_name as fallback if metadata name is "Unknown"
         title = metadata.get("name", file_name) if metadata.get("name") != "Unknown" else file_name
         
-        # If Gemini API is available, use it for intelligent README generation
-        if gemini_model:
+        # If Gemini API is available and there is time for it, use it for intelligent README generation
+        if gemini_model and budget_low(GEMINI_MIN_SECONDS):
+            logger.warning(f"Only {time_remaining():.0f}s left for {title}, skipping Gemini")
+        elif gemini_model:
             try:
-                # Prepare notebook content for analysis
-                notebook_content = ""
+                # Prepare notebook content for analysis, stopping once past the limit below
+                parts = []
+                length = 0
                 for i, cell in enumerate(cells):
                     cell_type = cell.get("cell_type", "unknown")
                     source = cell.get("source", "")
                     if source:
-                        notebook_content += f"=== Cell {i+1} ({cell_type}) ===\n{source}\n\n"
-                
+                        parts.append(f"=== Cell {i+1} ({cell_type}) ===\n{source}\n\n")
+                        length += len(parts[-1])
+                        if length > 15000:
+                            break
+                notebook_content = "".join(parts)
+
                 # Limit content length for API call
                 if len(notebook_content) > 15000:  # Reasonable limit for API
                     notebook_content = notebook_content[:15000] + "\n\n... (content truncated)"
@@ -208,7 +3035,8 @@ Make it informative but concise, suitable for a GitHub repository.
                 
                 # Generate README using Gemini
                 logger.debug("Using Gemini API to generate README")
-                response = gemini_model.generate_content(prompt)
+                tool_progress(f"Gemini request sent ({len(prompt)} characters)")
+                response = gemini_generate(prompt)
                 
                 if response.text:
                     logger.debug(f"Generated AI-powered README for {title}")
@@ -221,6 +3049,7 @@ Make it informative but concise, suitable for a GitHub repository.
         
         # Fallback to basic README generation
         logger.debug("Using basic README generation")
+        tool_progress("Generating basic README")
         
         # Extract markdown cells for description
         description = ""
@@ -252,120 +3081,27 @@ Make it informative but concise, suitable for a GitHub repository.
         
         if libraries_used:
             readme_content += "## Libraries Used\n"
-            for lib in sorted(libraries_used):
-                readme_content += f"- {lib}\n"
-            readme_content += "\n"
-        
-        readme_content += "## How to Use\n"
-        readme_content += "1. Open the notebook in Google Colab\n"
-        readme_content += "2. Run the cells sequentially\n"
-        readme_content += "3. Make sure to install any required dependencies\n\n"
-        
-        readme_content += "## Structure\n"
-        readme_content += f"The notebook contains {len([c for c in cells if c.get('cell_type') == 'code'])} code cells and {len([c for c in cells if c.get('cell_type') == 'markdown'])} markdown cells.\n"
-        
-        logger.debug(f"Generated basic README for {title}")
-        return {"readme": readme_content}
-        
-    except Exception as e:
-        logger.error(f"Error in generate_readme: {e}")
-        return {"error": str(e)}
-
-@mcp.tool()
-def create_github_repo(file_id: str, file_name: str, repo_name: str, repo_description: str = "", is_private: bool = False):
-    """Create a GitHub repository and upload a Colab notebook with generated README."""
-    logger.debug(f"Creating GitHub repo: {repo_name} for file: {file_name}")
-    
-    if not github_client:
-        return {"error": "GitHub API not configured. Please set GITHUB_TOKEN in .env file."}
-    
-    try:
-        # Get the authenticated user
-        user = github_client.get_user()
-        
-        # Check if repo already exists
-        try:
-            existing_repo = user.get_repo(repo_name)
-            return {"error": f"Repository '{repo_name}' already exists at {existing_repo.html_url}"}
-        except:
-            # Repo doesn't exist, we can create it
-            pass
-        
-        # Create the repository
-        logger.debug(f"Creating repository: {repo_name}")
-        
-        # Sanitize description to remove control characters
-        clean_description = repo_description or f"Google Colab notebook: {file_name}"
-        # Remove control characters except space and basic punctuation
-        clean_description = ''.join(char for char in clean_description if ord(char) >= 32 or char in '\t\n\r')
-        # Remove any remaining problematic characters and limit length
-        clean_description = clean_description.strip().replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        # Collapse multiple spaces into single space
-        clean_description = re.sub(r'\s+', ' ', clean_description)
-        # Limit to GitHub's description length limit (100 characters)
-        clean_description = clean_description[:100]
-        
-        repo = user.create_repo(
-            name=repo_name,
-            description=clean_description,
-            private=is_private,
-            auto_init=False,  # We'll add our own files
-            has_issues=True,
-            has_wiki=True,
-            has_downloads=True
-        )
-        
-        # Generate README content
-        logger.debug("Generating README content")
-        readme_result = generate_readme(file_id, file_name)
-        if "error" in readme_result:
-            # Clean up the created repo if README generation fails
-            repo.delete()
-            return {"error": f"Failed to generate README: {readme_result['error']}"}
-        
-        readme_content = readme_result["readme"]
-        
-        # Download the Colab notebook content
-        logger.debug("Downloading Colab notebook content")
-        notebook_result = read_colab_notebook(file_id)
-        if "error" in notebook_result:
-            # Clean up the created repo if notebook download fails
-            repo.delete()
-            return {"error": f"Failed to read notebook: {notebook_result['error']}"}
-        
-        # Get the original notebook file content as JSON
-        request = drive_service.files().get_media(fileId=file_id)
-        file_stream = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_stream, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
+            for lib in sorted(libraries_used):
+                readme_content += f"- {lib}\n"
+            readme_content += "\n"
         
-        file_stream.seek(0)
-        notebook_json = file_stream.read().decode('utf-8')
+        readme_content += "## How to Use\n"
+        readme_content += "1. Open the notebook in Google Colab\n"
+        readme_content += "2. Run the cells sequentially\n"
+        readme_content += "3. Make sure to install any required dependencies\n\n"
         
-        # Create and upload README.md
-        logger.debug("Uploading README.md")
-        repo.create_file(
-            path="README.md",
-            message="Add README with notebook description",
-            content=readme_content
-        )
+        readme_content += "## Structure\n"
+        readme_content += f"The notebook contains {len([c for c in cells if c.get('cell_type') == 'code'])} code cells and {len([c for c in cells if c.get('cell_type') == 'markdown'])} markdown cells.\n"
         
-        # Create and upload the notebook file
-        logger.debug(f"Uploading {file_name}")
-        # Ensure file_name has .ipynb extension
-        if not file_name.endswith('.ipynb'):
-            file_name += '.ipynb'
-            
-        repo.create_file(
-            path=file_name,
-            message=f"Add {file_name} notebook",
-            content=notebook_json
-        )
+        logger.debug(f"Generated basic README for {title}")
+        return {"readme": readme_content}
         
-        # Create a simple .gitignore for Python projects
-        gitignore_content = """# Byte-compiled / optimized / DLL files
+    except Exception as e:
+        logger.error(f"Error in generate_readme: {e}")
+        return {"error": str(e)}
+
+# .gitignore uploaded with every notebook repository
+PYTHON_GITIGNORE = """# Byte-compiled / optimized / DLL files
 __pycache__/
 *.py[cod]
 *$py.class
@@ -407,29 +3143,134 @@ venv.bak/
 # Google Colab
 .colab/
 """
+
+@managed_tool()
+def create_github_repo(file_id: str, file_name: str, repo_name: str, repo_description: str = "", is_private: bool = False):
+    """Create a GitHub repository and upload a Colab notebook with generated README."""
+    logger.debug(f"Creating GitHub repo: {repo_name} for file: {file_name}")
+    
+    if not github_client:
+        return {"error": "GitHub API not configured. Please set GITHUB_TOKEN in .env file."}
+    
+    try:
+        # Get the authenticated user
+        user = github_client.get_user()
+        
+        # Check if repo already exists
+        try:
+            existing_repo = user.get_repo(repo_name)
+            return {"error": f"Repository '{repo_name}' already exists at {existing_repo.html_url}"}
+        except GithubException:
+            # Repo doesn't exist, we can create it
+            pass
+        
+        # Create the repository
+        logger.debug(f"Creating repository: {repo_name}")
+        
+        # Sanitize description to remove control characters
+        clean_description = repo_description or f"Google Colab notebook: {file_name}"
+        # Remove control characters except space and basic punctuation
+        clean_description = ''.join(char for char in clean_description if ord(char) >= 32 or char in '\t\n\r')
+        # Remove any remaining problematic characters and limit length
+        clean_description = clean_description.strip().replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+        # Collapse multiple spaces into single space
+        clean_description = re.sub(r'\s+', ' ', clean_description)
+        # Limit to GitHub's description length limit (100 characters)
+        clean_description = clean_description[:100]
         
-        repo.create_file(
-            path=".gitignore",
-            message="Add .gitignore for Python projects",
-            content=gitignore_content
+        repo = user.create_repo(
+            name=repo_name,
+            description=clean_description,
+            private=is_private,
+            auto_init=False,  # We'll add our own files
+            has_issues=True,
+            has_wiki=True,
+            has_downloads=True
         )
+        tool_progress(f"Created repository {repo.full_name}")
         
-        # Get repository stats
-        repo_info = {
-            "repo_name": repo.name,
-            "repo_url": repo.html_url,
-            "clone_url": repo.clone_url,
-            "ssh_url": repo.ssh_url,
-            "description": repo.description,
-            "is_private": repo.private,
-            "files_uploaded": [
-                "README.md",
-                file_name,
-                ".gitignore"
-            ],
-            "created_at": repo.created_at.isoformat(),
-            "owner": user.login
-        }
+        try:
+            # Generate README content
+            logger.debug("Generating README content")
+            readme_result = generate_readme(file_id, file_name)
+            if "error" in readme_result:
+                # Clean up the created repo if README generation fails
+                return rollback_result(repo, f"Failed to generate README: {readme_result['error']}")
+            
+            readme_content = readme_result["readme"]
+            
+            # Download the Colab notebook content
+            logger.debug("Downloading Colab notebook content")
+            tool_progress(f"Downloading notebook {file_name}")
+            notebook_result = read_colab_notebook(file_id)
+            if "error" in notebook_result:
+                # Clean up the created repo if notebook download fails
+                return rollback_result(repo, f"Failed to read notebook: {notebook_result['error']}")
+            
+            # Get the original notebook file content as JSON
+            notebook_json = download_drive_file(file_id).decode('utf-8')
+            
+            # Create and upload README.md
+            tool_checkpoint()
+            logger.debug("Uploading README.md")
+            repo.create_file(
+                path="README.md",
+                message="Add README with notebook description",
+                content=readme_content
+            )
+            tool_progress("Uploaded README.md")
+            
+            # Create and upload the notebook file
+            tool_checkpoint()
+            logger.debug(f"Uploading {file_name}")
+            # Ensure file_name has .ipynb extension
+            if not file_name.endswith('.ipynb'):
+                file_name += '.ipynb'
+            
+            repo.create_file(
+                path=file_name,
+                message=f"Add {file_name} notebook",
+                content=notebook_json
+            )
+            tool_progress(f"Uploaded {file_name}")
+            
+            # Create a simple .gitignore for Python projects
+            gitignore_content = PYTHON_GITIGNORE
+            
+            tool_checkpoint()
+            repo.create_file(
+                path=".gitignore",
+                message="Add .gitignore for Python projects",
+                content=gitignore_content
+            )
+            tool_progress("Uploaded .gitignore")
+            
+            # Get repository stats
+            repo_info = {
+                "repo_name": repo.name,
+                "repo_url": repo.html_url,
+                "clone_url": repo.clone_url,
+                "ssh_url": repo.ssh_url,
+                "description": repo.description,
+                "is_private": repo.private,
+                "files_uploaded": [
+                    "README.md",
+                    file_name,
+                    ".gitignore"
+                ],
+                "created_at": repo.created_at.isoformat(),
+                "owner": user.login
+            }
+        except (ToolCancelled, DeadlineExceeded) as e:
+            # Don't leave a half-created repository behind when the call is cancelled or runs out of time
+            logger.warning(f"Creation of {repo_name} stopped ({e}), deleting partial repository")
+            rollback_error = delete_partial_repo(repo)
+            if rollback_error is None:
+                raise
+            note = f"partial repository {repo.html_url} could not be deleted: {rollback_error}"
+            if isinstance(e, ToolCancelled):
+                raise ToolCancelled(f"{e}; {note}") from e
+            return {"error": f"{e}; {note}", "partial_repository": repo.html_url}
         
         logger.debug(f"Successfully created repository: {repo.html_url}")
         return {
@@ -442,7 +3283,164 @@ venv.bak/
         logger.error(f"Error creating GitHub repository: {e}")
         return {"error": str(e)}
 
+def delete_partial_repo(repo):
+    """Delete a repository whose creation didn't finish; returns None, or why it couldn't be deleted.
+
+    Runs outside the tool call, so the cancellation or spent deadline that stopped the
+    creation doesn't stop the cleanup; a rate limit wait longer than
+    GITHUB_BACKGROUND_MAX_WAIT_SECONDS fails it instead of stalling.
+    """
+    token = _current_call.set(None)
+    try:
+        repo.delete()
+        return None
+    except Exception as e:
+        logger.error(f"Could not delete partial repository {repo.full_name}: {e}")
+        return f"{e.__class__.__name__}: {e}"
+    finally:
+        _current_call.reset(token)
+
+def rollback_result(repo, error):
+    """Error result for a creation that failed after the repository was made, after deleting it"""
+    rollback_error = delete_partial_repo(repo)
+    if rollback_error is None:
+        return {"error": error}
+    return {
+        "error": f"{error}; partial repository {repo.html_url} could not be deleted: {rollback_error}",
+        "partial_repository": repo.html_url
+    }
+
+BULK_UPLOAD_MAX_CONCURRENCY = int(os.getenv("BULK_UPLOAD_MAX_CONCURRENCY", "4"))
+
+def notebook_placeholders(notebook_name: str, index: int):
+    """Values for the repository name and description templates of a notebook.
+
+    {name} is the notebook name without extension, {slug} the name reduced to
+    characters GitHub accepts and {index} the 1-based position.
+    """
+    name = notebook_name[:-len('.ipynb')] if notebook_name.endswith('.ipynb') else notebook_name
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '-', name).strip('-.') or f"notebook-{index}"
+    return {"name": name, "slug": slug, "index": index}
+
+def make_repo_name(template: str, notebook_name: str, index: int):
+    """Render a repository name template for a notebook (placeholders as in notebook_placeholders)"""
+    rendered = template.format(**notebook_placeholders(notebook_name, index))
+    # GitHub would silently rewrite invalid characters, so do it here and report the real name
+    return re.sub(r'[^A-Za-z0-9._-]+', '-', rendered).strip('-')[:100]
+
 @mcp.tool()
+@admission_controlled
+async def create_github_repos_from_drive_folder(
+    folder_id: str,
+    repo_name_template: str = "{slug}",
+    repo_description_template: str = "",
+    is_private: bool = False,
+    max_concurrency: int = BULK_UPLOAD_MAX_CONCURRENCY,
+    deadline_seconds: Optional[float] = None,
+    ctx: Context = None
+):
+    """Create one GitHub repository per Colab notebook in a Google Drive folder.
+    
+    Runs the create_github_repo pipeline (download, README, upload) for every notebook in the
+    folder with bounded concurrency and reports progress as each notebook finishes.
+    
+    Args:
+        folder_id: Google Drive folder ID containing the notebooks
+        repo_name_template: Repository name template; placeholders {name}, {slug}, {index}. Default: '{slug}'
+        repo_description_template: Optional description template with the same placeholders
+        is_private: Whether to create private repositories. Default: False
+        max_concurrency: Number of notebooks processed at once (1-10). Default: 4
+        deadline_seconds: Time budget for the whole folder; notebooks not started by then are skipped
+    """
+    logger.debug(f"Bulk creating GitHub repos from folder: {folder_id}, template: {repo_name_template}")
+    
+    if not github_client:
+        return {"error": "GitHub API not configured. Please set GITHUB_TOKEN in .env file."}
+    
+    try:
+        make_repo_name(repo_name_template, "notebook", 1)
+        if repo_description_template:
+            repo_description_template.format(**notebook_placeholders("notebook", 1))
+    except (KeyError, IndexError, ValueError) as e:
+        return {"error": f"Invalid template: {e}. Supported placeholders: {{name}}, {{slug}}, {{index}}"}
+    
+    deadline = tool_deadline("create_github_repos_from_drive_folder", deadline_seconds)
+    call = ToolCall("create_github_repos_from_drive_folder", deadline_seconds=deadline, session=session_key(ctx))
+    
+    def list_folder_notebooks():
+        colab_index.sync(drive_service)
+        return colab_index.list(folder_id)
+    
+    try:
+        # Within the call, so the Drive paging honours its deadline, cancellation and backend slots
+        notebooks = await run_in_worker(call, list_folder_notebooks)
+    except Exception as e:
+        logger.error(f"Error listing notebooks in folder {folder_id}: {e}")
+        return {"error": str(e)}
+    if isinstance(notebooks, dict):
+        return notebooks  # The listing was cancelled or ran out of time
+    
+    if not notebooks:
+        return {"error": f"No Colab notebooks found in folder '{folder_id}'"}
+    
+    max_concurrency = max(1, min(max_concurrency, 10))
+    limiter = anyio.CapacityLimiter(max_concurrency)
+    total = len(notebooks)
+    results = [None] * total
+    completed = 0
+    
+    await report_progress(ctx, 0, total, f"Found {total} notebooks")
+    
+    async def process(index, notebook):
+        nonlocal completed
+        item = {"file_id": notebook["id"], "file_name": notebook["name"], "repo_name": None}
+        try:
+            repo_name = make_repo_name(repo_name_template, notebook["name"], index + 1)
+            item["repo_name"] = repo_name
+            description = repo_description_template.format(
+                **notebook_placeholders(notebook["name"], index + 1)
+            ) if repo_description_template else ""
+            async with limiter:
+                if call.budget_low(MIN_FETCH_SECONDS):
+                    result = {"skipped": True, "error": "Skipped: deadline reached before this notebook started"}
+                else:
+                    result = await run_in_worker(
+                        call, create_github_repo, notebook["id"], notebook["name"], repo_name, description, is_private
+                    )
+        except Exception as e:
+            result = {"error": str(e)}
+        
+        if result.get("success"):
+            item["status"] = "created"
+            item["repo_url"] = result["repository"]["repo_url"]
+        elif result.get("skipped"):
+            item["status"] = "skipped"
+            item["error"] = result["error"]
+        else:
+            item["status"] = "failed"
+            item["error"] = result.get("error", "Unknown error")
+        results[index] = item
+        
+        completed += 1
+        await report_progress(ctx, completed, total, f"{item['status']}: {notebook['name']} -> {item['repo_name']}")
+    
+    async with anyio.create_task_group() as tg:
+        for index, notebook in enumerate(notebooks):
+            tg.start_soon(process, index, notebook)
+    
+    created = [r for r in results if r["status"] == "created"]
+    skipped = [r for r in results if r["status"] == "skipped"]
+    logger.debug(f"Bulk upload finished: {len(created)}/{total} repositories created")
+    return {
+        "folder_id": folder_id,
+        "total_notebooks": total,
+        "created": len(created),
+        "failed": total - len(created) - len(skipped),
+        "skipped": len(skipped),
+        "results": results
+    }
+
+@managed_tool()
 def list_github_repos(repo_type: str = "all", sort: str = "updated", per_page: int = 30):
     """List GitHub repositories for the authenticated user.
     
@@ -490,6 +3488,7 @@ def list_github_repos(repo_type: str = "all", sort: str = "updated", per_page: i
         repo_list = []
         count = 0
         for repo in repos:
+            tool_checkpoint()
             if count >= per_page:
                 break
             repo_info = {
@@ -544,7 +3543,28 @@ def list_github_repos(repo_type: str = "all", sort: str = "updated", per_page: i
         logger.error(f"Error listing GitHub repositories: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+# Time left below which a repository traversal stops fetching and returns what it has
+MIN_FETCH_SECONDS = 3.0
+
+def requested_extensions(file_types):
+    """The extensions in a comma-separated file_types argument, as read_github_repo_files reports them"""
+    return [ext.strip().lower() for ext in file_types.split(',')]
+
+def normalize_repo_read(repo_name, file_types, max_files):
+    """Single-flight key for read_github_repo_files: the repository and the effective file selection"""
+    extensions = tuple(sorted({ext for ext in requested_extensions(file_types) if ext}))
+    if max_files < 1 or max_files > 200:
+        max_files = 50
+    return repo_name.strip().lower(), extensions, max_files
+
+def echo_repo_read(result, repo_name, file_types, max_files):
+    """A shared read_github_repo_files result, reporting the caller's own file types"""
+    if "summary" in result:
+        result["summary"]["file_types_requested"] = requested_extensions(file_types)
+    return result
+
+@managed_tool()
+@single_flight(normalize_repo_read, echo_repo_read)
 def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,txt", max_files: int = 50):
     """Read files from a specific GitHub repository.
     
@@ -565,12 +3585,12 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
         
         # Get the repository
         try:
-            repo = github_client.get_repo(repo_name)
+            repo = get_repo_for_read(repo_name)
         except Exception as e:
             return {"error": f"Repository '{repo_name}' not found or not accessible: {str(e)}"}
         
         # Parse file types
-        allowed_extensions = [ext.strip().lower() for ext in file_types.split(',')]
+        allowed_extensions = requested_extensions(file_types)
         if not allowed_extensions:
             allowed_extensions = ['py', 'js', 'ts', 'java', 'md', 'txt']
         
@@ -578,6 +3598,18 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
         if max_files < 1 or max_files > 200:
             max_files = 50
         
+        # A push changes pushed_at, so a cached read is never older than the repository's content;
+        # private repositories are only shared between calls made with the same credentials as this
+        # read (the server's pool outside a session, the session's own client inside one)
+        cache_key = json.dumps([
+            repo.full_name.lower(), str(repo.pushed_at), sorted(set(allowed_extensions)), max_files,
+            session_fingerprint() if repo.private else "public"
+        ])
+        cached = shared_cache.get("repo", cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached file read for {repo_name}")
+            return echo_repo_read(cached, repo_name, file_types, max_files)
+        
         # Get repository information
         repo_info = {
             "name": repo.name,
@@ -591,21 +3623,33 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
             "private": repo.private
         }
         
+        truncated_by_deadline = False
+        # Directories and files the backend failed on; a read with any of these is incomplete
+        failed_paths = []
+        failed_files = []
+        
         # Function to recursively get files from repository
         def get_files_recursive(path="", current_depth=0, max_depth=5):
             """Recursively get files from repository with depth limit"""
             if current_depth > max_depth:
                 return []
             
+            nonlocal truncated_by_deadline
             files_found = []
             try:
-                contents = repo.get_contents(path)
+                contents = run_cancellable(repo.get_contents, path)
                 if not isinstance(contents, list):
                     contents = [contents]
+                tool_progress(f"Scanned directory '{path or '/'}' ({len(contents)} entries)")
                 
                 for content in contents:
+                    tool_checkpoint()
                     if len(files_found) >= max_files:
                         break
+                    # Return what has been read so far rather than running into the deadline
+                    if budget_low(MIN_FETCH_SECONDS):
+                        truncated_by_deadline = True
+                        break
                         
                     if content.type == "file":
                         # Check if file extension matches our criteria
@@ -618,7 +3662,8 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
                         if file_extension in allowed_extensions or is_readme:
                             try:
                                 # Get file content (decode from base64)
-                                file_content = content.decoded_content.decode('utf-8', errors='ignore')
+                                file_content = run_cancellable(lambda: content.decoded_content).decode('utf-8', errors='ignore')
+                                tool_progress(f"Fetched {content.path}")
                                 
                                 # Limit content size to prevent overwhelming responses
                                 max_content_size = 10000  # 10KB per file
@@ -634,9 +3679,12 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
                                     "url": content.html_url,
                                     "download_url": content.download_url
                                 })
+                            except DeadlineExceeded:
+                                raise
                             except Exception as e:
-                                # If we can't decode the file, skip it
+                                # Skip the file, but report it so the read isn't taken for complete
                                 logger.warning(f"Could not read file {content.path}: {e}")
+                                failed_files.append({"path": content.path, "error": f"{e.__class__.__name__}: {e}"[:200]})
                                 continue
                     
                     elif content.type == "dir" and current_depth < max_depth:
@@ -647,8 +3695,11 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
                         if len(files_found) >= max_files:
                             break
                             
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 logger.warning(f"Error accessing path '{path}': {e}")
+                failed_paths.append({"path": path or "/", "error": f"{e.__class__.__name__}: {e}"[:200]})
             
             return files_found[:max_files]
         
@@ -669,22 +3720,35 @@ def read_github_repo_files(repo_name: str, file_types: str = "py,js,ts,java,md,t
             "total_files_found": len(files),
             "files_by_type": {file_type: len(file_list) for file_type, file_list in files_by_type.items()},
             "file_types_requested": allowed_extensions,
-            "search_depth": "5 levels (max)"
+            "search_depth": "5 levels (max)",
+            "truncated_by_deadline": truncated_by_deadline,
+            "partial": bool(failed_paths or failed_files),
+            "failed_paths": failed_paths,
+            "failed_files": failed_files
         }
         
         logger.debug(f"Found {len(files)} files in repository {repo_name}")
-        return {
+        result = {
             "repository": repo_info,
             "summary": summary,
             "files": files,
             "files_by_type": files_by_type
         }
+        # Only a complete read may serve other calls; a truncated or partial one is retried next time
+        if not truncated_by_deadline and not summary["partial"]:
+            shared_cache.set("repo", cache_key, result, ttl=REPO_CACHE_TTL_SECONDS)
+        return result
         
     except Exception as e:
         logger.error(f"Error reading repository files: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+def normalize_repo_analysis(repo_name, analysis_type, max_files_to_analyze):
+    """Single-flight key for analyze_github_repo_with_ai; analysis_type is matched exactly, as the tool does"""
+    return repo_name.strip().lower(), analysis_type, max_files_to_analyze
+
+@managed_tool()
+@single_flight(normalize_repo_analysis)
 def analyze_github_repo_with_ai(repo_name: str, analysis_type: str = "comprehensive", max_files_to_analyze: int = 20):
     """Analyze a GitHub repository using AI to provide insights and summaries.
     
@@ -706,7 +3770,9 @@ def analyze_github_repo_with_ai(repo_name: str, analysis_type: str = "comprehens
         file_types = "py,js,ts,java,md,txt,json,yml,yaml" if analysis_type in ["comprehensive", "code_only"] else "md,txt"
         max_files = min(max_files_to_analyze, 50)  # Limit to prevent overwhelming the AI
         
-        files_result = read_github_repo_files(repo_name, file_types, max_files)
+        # Leave enough of the deadline for the Gemini request
+        with reserve_budget(GEMINI_MIN_SECONDS):
+            files_result = read_github_repo_files(repo_name, file_types, max_files)
         
         if "error" in files_result:
             return files_result
@@ -716,6 +3782,8 @@ def analyze_github_repo_with_ai(repo_name: str, analysis_type: str = "comprehens
         summary = files_result.get("summary", {})
         
         if not files:
+            if summary.get("truncated_by_deadline"):
+                return {"error": "Deadline too short to read any files for analysis", "partial": True}
             return {"error": "No files found in repository for analysis"}
         
         # Prepare content for AI analysis
@@ -839,24 +3907,40 @@ Repository Information:
         if len(prompt) > 25000:  # Reasonable limit for Gemini
             prompt = prompt[:25000] + "\n\n[Content truncated for analysis efficiency]"
         
+        files_analyzed = {
+            "total_files": len(files),
+            "readme_files": len(readme_files),
+            "code_files": len(code_files),
+            "other_files": len(other_files),
+            "file_types": summary.get('files_by_type', {}),
+            "truncated_by_deadline": summary.get('truncated_by_deadline', False)
+        }
+        
+        if budget_low(GEMINI_MIN_SECONDS):
+            # Not enough time for Gemini; hand back what was collected instead of timing out
+            return {
+                "error": f"Deadline too close to run the AI analysis ({time_remaining():.0f}s left)",
+                "partial": True,
+                "repository_info": repository,
+                "analysis_type": analysis_type,
+                "files_analyzed": files_analyzed,
+                "files": [file_info["path"] for file_info in files]
+            }
+        
         # Generate AI analysis
         logger.debug("Generating AI analysis using Gemini")
-        response = gemini_model.generate_content(prompt)
+        tool_progress(f"Gemini request sent ({len(prompt)} characters from {len(files)} files)")
+        response = gemini_generate(prompt)
         
         if not response.text:
             return {"error": "AI analysis failed to generate content"}
+        tool_progress("Gemini analysis received")
         
         # Create comprehensive result
         result = {
             "repository_info": repository,
             "analysis_type": analysis_type,
-            "files_analyzed": {
-                "total_files": len(files),
-                "readme_files": len(readme_files),
-                "code_files": len(code_files),
-                "other_files": len(other_files),
-                "file_types": summary.get('files_by_type', {})
-            },
+            "files_analyzed": files_analyzed,
             "ai_analysis": response.text,
             "analysis_metadata": {
                 "model_used": "gemini-2.5-flash",
@@ -874,6 +3958,83 @@ Repository Information:
         return {"error": str(e)}
 
 @mcp.tool()
+@admission_controlled
+async def analyze_github_repos_batch(
+    repo_names: list[str],
+    analysis_type: str = "comprehensive",
+    max_files_to_analyze: int = 20,
+    max_concurrency: int = 4,
+    deadline_seconds: Optional[float] = None,
+    ctx: Context = None
+):
+    """Analyze many GitHub repositories with AI, streaming each result as it completes.
+    
+    Each finished repository is sent immediately as an MCP log notification (JSON) and progress
+    update; the final response collects all results. Failures are recorded per repository.
+    
+    Args:
+        repo_names: Repository names in format 'owner/repo'
+        analysis_type: Type of analysis ('comprehensive', 'readme_only', 'code_only', 'structure'). Default: 'comprehensive'
+        max_files_to_analyze: Maximum number of files to analyze per repository. Default: 20
+        max_concurrency: Number of repositories analyzed at once (1-10). Default: 4
+        deadline_seconds: Time budget for the whole batch; repositories not started by then are skipped
+    """
+    logger.debug(f"Batch AI analysis of {len(repo_names)} repos, analysis_type: {analysis_type}")
+    
+    if not github_client:
+        return {"error": "GitHub API not configured. Please set GITHUB_TOKEN in .env file."}
+    
+    if not gemini_model:
+        return {"error": "Gemini AI not configured. Please set GEMINI_API_KEY in .env file."}
+    
+    # Drop duplicates but keep the caller's order
+    repo_names = list(dict.fromkeys(name.strip() for name in repo_names if name.strip()))
+    if not repo_names:
+        return {"error": "No repositories given"}
+    
+    limiter = anyio.CapacityLimiter(max(1, min(max_concurrency, 10)))
+    deadline = tool_deadline("analyze_github_repos_batch", deadline_seconds)
+    call = ToolCall("analyze_github_repos_batch", deadline_seconds=deadline, session=session_key(ctx))
+    total = len(repo_names)
+    results = {}
+    completed = 0
+    
+    async def analyze(repo_name):
+        nonlocal completed
+        async with limiter:
+            if github_budget_exhausted():
+                result = {"error": "Skipped: GitHub rate limit budget exhausted, retry after the limit resets"}
+            elif call.budget_low(GEMINI_MIN_SECONDS):
+                result = {"error": "Skipped: deadline reached before this repository started"}
+            else:
+                try:
+                    result = await run_in_worker(
+                        call, analyze_github_repo_with_ai, repo_name, analysis_type, max_files_to_analyze
+                    )
+                except Exception as e:
+                    result = {"error": str(e)}
+        
+        item = {"repo_name": repo_name, "status": "failed" if "error" in result else "completed", "result": result}
+        results[repo_name] = item
+        completed += 1
+        await send_log(ctx, json.dumps(item), "analyze_github_repos_batch")
+        await report_progress(ctx, completed, total, f"{item['status']}: {repo_name}")
+    
+    async with anyio.create_task_group() as tg:
+        for repo_name in repo_names:
+            tg.start_soon(analyze, repo_name)
+    
+    succeeded = [name for name in repo_names if results[name]["status"] == "completed"]
+    logger.debug(f"Batch analysis finished: {len(succeeded)}/{total} repositories analyzed")
+    return {
+        "analysis_type": analysis_type,
+        "total_repositories": total,
+        "succeeded": len(succeeded),
+        "failed": total - len(succeeded),
+        "results": [results[name] for name in repo_names]
+    }
+
+@managed_tool()
 def summarize_repo_analysis_for_resume(repo_name: str, analysis_text: str, focus_area: str = "technical"):
     """Summarize repository analysis into 3 resume-worthy bullet points using AI.
     
@@ -922,7 +4083,7 @@ Please provide exactly 3 bullet points in this format:
         
         # Generate summary using Gemini
         logger.debug("Generating resume summary using Gemini")
-        response = gemini_model.generate_content(prompt)
+        response = gemini_generate(prompt)
         
         if not response.text:
             return {"error": "AI failed to generate resume summary"}
@@ -974,7 +4135,7 @@ Please provide exactly 3 bullet points in this format:
         logger.error(f"Error generating resume summary: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+@managed_tool()
 def list_google_docs(search_term: str = "resume"):
     """List Google Docs documents, optionally filtered by search term.
     
@@ -992,11 +4153,11 @@ def list_google_docs(search_term: str = "resume"):
         if search_term:
             query += f" and name contains '{search_term}'"
         
-        results = docs_drive_service.files().list(
+        results = google_execute(docs_drive_service.files().list(
             q=query,
             fields="files(id, name, mimeType, webViewLink, modifiedTime, owners)",
             pageSize=20
-        ).execute()
+        ))
         
         files = results.get("files", [])
         
@@ -1022,7 +4183,7 @@ def list_google_docs(search_term: str = "resume"):
         logger.error(f"Error listing Google Docs: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+@managed_tool()
 def create_google_doc(title: str, content: str = "", section_title: str = "GitHub Repository Analysis"):
     """Create a new Google Docs document with optional content.
     
@@ -1038,7 +4199,7 @@ def create_google_doc(title: str, content: str = "", section_title: str = "GitHu
     
     try:
         # Create a new document
-        doc = docs_service.documents().create(body={'title': title}).execute()
+        doc = google_execute(docs_service.documents().create(body={'title': title}))
         doc_id = doc.get('documentId')
         
         logger.debug(f"Created new document with ID: {doc_id}")
@@ -1060,10 +4221,10 @@ def create_google_doc(title: str, content: str = "", section_title: str = "GitHu
             ]
             
             # Apply the updates
-            docs_service.documents().batchUpdate(
+            google_execute(docs_service.documents().batchUpdate(
                 documentId=doc_id,
                 body={'requests': requests}
-            ).execute()
+            ))
         
         # Get document info for response
         doc_info = {
@@ -1085,7 +4246,42 @@ def create_google_doc(title: str, content: str = "", section_title: str = "GitHu
         logger.error(f"Error creating Google Doc: {e}")
         return {"error": str(e)}
 
-@mcp.tool()
+def append_sections_to_google_doc(doc_id, sections):
+    """Append (section_title, content) pairs to the end of a document in a single batchUpdate.
+    
+    Returns the document as read before the update, the insertion index and the batchUpdate result.
+    """
+    # First, get the current document to find the end
+    doc = google_execute(docs_service.documents().get(documentId=doc_id))
+    doc_content = doc.get('body', {})
+    
+    # Get the end index of the document
+    end_index = doc_content.get('content', [{}])[-1].get('endIndex', 1) - 1
+    
+    # Prepare the content to insert
+    formatted_content = "".join(f"\n\n{section_title}\n{content}\n" for section_title, content in sections)
+    
+    # Create the requests for inserting content
+    requests = [
+        {
+            'insertText': {
+                'location': {
+                    'index': end_index,
+                },
+                'text': formatted_content
+            }
+        }
+    ]
+    
+    # Apply the updates
+    result = google_execute(docs_service.documents().batchUpdate(
+        documentId=doc_id,
+        body={'requests': requests}
+    ))
+    
+    return doc, end_index, result
+
+@managed_tool()
 def add_to_google_doc(doc_id: str, content: str, section_title: str = "GitHub Repository Analysis"):
     """Add content to a Google Docs document.
     
@@ -1100,33 +4296,7 @@ def add_to_google_doc(doc_id: str, content: str, section_title: str = "GitHub Re
         return {"error": "Google Docs API not configured. Please check your credentials and permissions."}
     
     try:
-        # First, get the current document to find the end
-        doc = docs_service.documents().get(documentId=doc_id).execute()
-        doc_content = doc.get('body', {})
-        
-        # Get the end index of the document
-        end_index = doc_content.get('content', [{}])[-1].get('endIndex', 1) - 1
-        
-        # Prepare the content to insert
-        formatted_content = f"\n\n{section_title}\n{content}\n"
-        
-        # Create the requests for inserting content
-        requests = [
-            {
-                'insertText': {
-                    'location': {
-                        'index': end_index,
-                    },
-                    'text': formatted_content
-                }
-            }
-        ]
-        
-        # Apply the updates
-        result = docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': requests}
-        ).execute()
+        doc, end_index, result = append_sections_to_google_doc(doc_id, [(section_title, content)])
         
         # Get document info for response
         doc_info = {
@@ -1150,10 +4320,487 @@ def add_to_google_doc(doc_id: str, content: str, section_title: str = "GitHub Re
         logger.error(f"Error adding content to Google Doc: {e}")
         return {"error": str(e)}
 
+# Time add_repos_to_resume keeps back from its deadline for writing the document
+DOC_WRITE_RESERVE_SECONDS = 15.0
+
+@mcp.tool()
+@admission_controlled
+async def add_repos_to_resume(
+    repo_names: list[str],
+    doc_id: str,
+    analysis_type: str = "comprehensive",
+    focus_area: str = "technical",
+    max_files_to_analyze: int = 25,
+    max_concurrency: int = 4,
+    deadline_seconds: Optional[float] = None,
+    ctx: Context = None
+):
+    """Analyze repositories, summarize each into resume bullet points and append them all to a Google Doc.
+    
+    Runs analyze_github_repo_with_ai and summarize_repo_analysis_for_resume on the server, keeping the
+    analysis in memory, then writes every repository's section to the document in one batched update.
+    
+    Args:
+        repo_names: Repository names in format 'owner/repo'
+        doc_id: Google Docs document ID of the resume
+        analysis_type: Type of analysis ('comprehensive', 'readme_only', 'code_only', 'structure'). Default: 'comprehensive'
+        focus_area: Focus of the summary ('technical', 'leadership', 'impact', 'learning'). Default: 'technical'
+        max_files_to_analyze: Maximum number of files to analyze per repository. Default: 25
+        max_concurrency: Number of repositories processed at once (1-10). Default: 4
+        deadline_seconds: Time budget for the whole call; repositories not started in time are skipped
+            so the summaries that did finish can still be written to the document
+    """
+    logger.debug(f"Adding {len(repo_names)} repos to resume {doc_id}, focus: {focus_area}")
+    
+    if not docs_service:
+        return {"error": "Google Docs API not configured. Please check your credentials and permissions."}
+    
+    repo_names = list(dict.fromkeys(name.strip() for name in repo_names if name.strip()))
+    if not repo_names:
+        return {"error": "No repositories given"}
+    
+    limiter = anyio.CapacityLimiter(max(1, min(max_concurrency, 10)))
+    deadline = tool_deadline("add_repos_to_resume", deadline_seconds)
+    call = ToolCall("add_repos_to_resume", deadline_seconds=deadline, session=session_key(ctx))
+    total = len(repo_names)
+    results = {}
+    completed = 0
+    
+    def summarize_repo(repo_name):
+        # Keep time for the final document write
+        with reserve_budget(DOC_WRITE_RESERVE_SECONDS):
+            analysis = analyze_github_repo_with_ai(repo_name, analysis_type, max_files_to_analyze)
+            if "error" in analysis:
+                return {"error": f"Analysis failed: {analysis['error']}"}
+            return summarize_repo_analysis_for_resume(repo_name, analysis["ai_analysis"], focus_area)
+    
+    async def process(repo_name):
+        nonlocal completed
+        try:
+            async with limiter:
+                if call.budget_low(GEMINI_MIN_SECONDS + DOC_WRITE_RESERVE_SECONDS):
+                    summary = {"error": "Skipped: deadline reached before this repository started"}
+                else:
+                    summary = await run_in_worker(call, summarize_repo, repo_name)
+        except Exception as e:
+            summary = {"error": str(e)}
+        results[repo_name] = summary
+        completed += 1
+        await report_progress(ctx, completed, total + 1, f"{'failed' if 'error' in summary else 'summarized'}: {repo_name}")
+    
+    async with anyio.create_task_group() as tg:
+        for repo_name in repo_names:
+            tg.start_soon(process, repo_name)
+    
+    sections = [
+        (f"GitHub Repository Analysis - {repo_name}", results[repo_name]["formatted_summary"])
+        for repo_name in repo_names if "error" not in results[repo_name]
+    ]
+    repositories = [
+        {"repo_name": repo_name, "status": "failed", "error": results[repo_name]["error"]}
+        if "error" in results[repo_name] else
+        {"repo_name": repo_name, "status": "added", "bullet_points": results[repo_name]["bullet_points"]}
+        for repo_name in repo_names
+    ]
+    
+    if not sections:
+        return {"error": "No repository could be summarized", "repositories": repositories}
+    
+    try:
+        doc, end_index, _ = await run_in_worker(call, append_sections_to_google_doc, doc_id, sections)
+    except Exception as e:
+        logger.error(f"Error adding resume sections to Google Doc: {e}")
+        for item in repositories:
+            if item["status"] == "added":
+                item["status"] = "not_written"
+        return {"error": f"Failed to update document: {e}", "repositories": repositories}
+    
+    await report_progress(ctx, total + 1, total + 1, f"Added {len(sections)} sections to the document")
+    logger.debug(f"Added {len(sections)} resume sections to {doc.get('title', 'Unknown')}")
+    return {
+        "success": True,
+        "message": f"Added {len(sections)} of {total} repositories to '{doc.get('title', 'Unknown')}'",
+        "document_info": {
+            "document_id": doc_id,
+            "title": doc.get('title', 'Unknown'),
+            "insertion_index": end_index,
+            "web_view_link": f"https://docs.google.com/document/d/{doc_id}/edit"
+        },
+        "repositories": repositories
+    }
+
+# Graceful shutdown: time in-flight calls get to finish after SIGTERM/SIGINT, then to clean up once aborted
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "20"))
+SHUTDOWN_ABORT_GRACE_SECONDS = float(os.getenv("SHUTDOWN_ABORT_GRACE_SECONDS", "5"))
+# How long uvicorn then waits for open HTTP connections (e.g. idle SSE streams) before closing them
+SHUTDOWN_CONNECTION_GRACE_SECONDS = 5
+
+class GracefulShutdown:
+    """Drains the server on SIGTERM/SIGINT before the process exits.
+
+    New calls are turned away with a busy response while admitted ones get up to
+    `drain_seconds` to finish. Calls still running after that are cancelled, which
+    runs their cleanup (e.g. create_github_repo deletes its partial repository), and
+    get `abort_grace_seconds` to stop. Buffered state is then flushed to disk, a
+    report of what was aborted is logged, and the signal is handed to uvicorn's
+    handler (or, on stdio, the process exits). A second signal skips the drain.
+    """
+
+    def __init__(self, drain_seconds, abort_grace_seconds):
+        self.drain_seconds = drain_seconds
+        self.abort_grace_seconds = abort_grace_seconds
+        self.report = None
+        self._previous = {}
+        self._thread = None
+
+    def install(self):
+        """Take over SIGTERM and SIGINT; call from the main thread after the server set its own handlers"""
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self._previous[signum] = signal.getsignal(signum)
+            signal.signal(signum, self._handle)
+
+    def _handle(self, signum, frame):
+        if self._thread is not None:
+            logger.warning(f"{signal.Signals(signum).name} received again, exiting without waiting for the drain")
+            self._forward(signum, frame)
+            return
+        self._thread = threading.Thread(target=self._run, args=(signum, frame), name="shutdown-drain", daemon=True)
+        self._thread.start()
+
+    def _forward(self, signum, frame):
+        previous = self._previous.get(signum)
+        if callable(previous) and previous is not signal.default_int_handler:
+            # uvicorn's handler: it stops listening and closes connections
+            previous(signum, frame)
+            return
+        # stdio: nothing else to wind down, and the stdin reader thread would keep a normal exit waiting
+        sys.stdout.flush()
+        logging.shutdown()
+        os._exit(0)
+
+    @staticmethod
+    def _busy():
+        """Calls not yet finished: admitted ones, plus abandoned ones whose worker thread still runs.
+
+        Admission is released when the awaiting task returns, which a client cancellation
+        makes happen before the worker reaches a checkpoint, so worker threads are counted
+        on their own (shared single-flight runs execute on a caller's worker and aren't).
+        """
+        with _active_calls_lock:
+            workers = sum(1 for call in _active_calls if not isinstance(call, SharedCall))
+        return max(admission_control.in_flight_calls(), workers)
+
+    @classmethod
+    def _wait_idle(cls, deadline):
+        while cls._busy() and time.monotonic() < deadline:
+            time.sleep(CANCEL_POLL_SECONDS)
+        return cls._busy()
+
+    @staticmethod
+    def _abort():
+        """Cancel every call still running and describe them for the report"""
+        now = time.monotonic()
+        by_tool = admission_control.snapshot()["in_flight_by_tool"]
+        with _active_calls_lock:
+            calls = list(_open_calls)
+            running = [
+                {"tool": call.name, "running_seconds": round(now - call.started_at, 1)}
+                for call in _active_calls if not isinstance(call, SharedCall)
+            ]
+        for call in calls:
+            call.cancel("server shutting down")
+        return {"by_tool": by_tool, "calls": running}
+
+    @staticmethod
+    def _flush():
+        """Write out what is still buffered in memory; returns what was flushed"""
+        sessions = client_pool.clients()
+        batchers = {id(b): b for b in [SessionBound.defaults["drive_batcher"], *(c.drive_batcher for c in sessions)] if b}
+        indexes = {id(i): i for i in [SessionBound.defaults["colab_index"], *(c.colab_index for c in sessions)] if i}
+        flushed = {"drive_batchers": 0, "colab_indexes": 0}
+        for batcher in batchers.values():
+            try:
+                batcher.flush()
+                flushed["drive_batchers"] += 1
+            except Exception as e:
+                logger.warning(f"Could not flush Drive metadata batch: {e}")
+        for index in indexes.values():
+            index.flush()
+            flushed["colab_indexes"] += 1
+        flushed["shared_cache"] = shared_cache.checkpoint()
+        return flushed
+
+    def _run(self, signum, frame):
+        started = time.monotonic()
+        name = signal.Signals(signum).name
+        admission_control.start_draining()
+        in_flight = self._busy()
+        logger.warning(f"{name} received, draining {in_flight} in-flight calls for up to {self.drain_seconds:.0f}s")
+        remaining = self._wait_idle(started + self.drain_seconds)
+        aborted = {"by_tool": {}, "calls": []}
+        if remaining:
+            logger.warning(f"Drain deadline reached with {remaining} calls still running, aborting them")
+            aborted = self._abort()
+            remaining = self._wait_idle(time.monotonic() + self.abort_grace_seconds)
+        self.report = {
+            "signal": name,
+            "drain_seconds": round(time.monotonic() - started, 3),
+            "in_flight_at_signal": in_flight,
+            "aborted": aborted,
+            "still_running_at_exit": remaining,
+            "rejected_while_draining": admission_control.snapshot()["rejected_draining"],
+            "flushed": self._flush()
+        }
+        logger.warning(f"Shutdown report: {json.dumps(self.report)}")
+        cpu_pool.shutdown()
+        self._forward(signum, frame)
+
+graceful_shutdown = GracefulShutdown(SHUTDOWN_DRAIN_SECONDS, SHUTDOWN_ABORT_GRACE_SECONDS)
+
+# Readiness: backends are probed in the background, so health checks never send traffic upstream
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "30"))
+HEALTH_PROBE_TIMEOUT_SECONDS = 10.0
+# Part of get_backend_health's deadline kept for building its answer after an on-demand probe
+HEALTH_TOOL_MARGIN_SECONDS = 1.0
+# Backends that must be reachable for /ready to answer 200; by default only draining makes it 503
+READINESS_REQUIRED_BACKENDS = [b.strip() for b in os.getenv("READINESS_REQUIRED_BACKENDS", "").split(",") if b.strip()]
+
+class HealthMonitor:
+    """Cached reachability of each backend, refreshed by a background thread over HTTP.
+
+    Every `interval` seconds each configured backend gets one lightweight request
+    with the server's credentials: GitHub's /rate_limit (which doesn't count against
+    the rate limit), Drive's about.get (Docs shares its credentials and front end)
+    and a Gemini model lookup. On stdio nothing polls /ready, so there is no thread
+    and get_backend_health probes on demand. Results go into the shared cache, so with several
+    workers one probe per interval serves them all. Readiness queries only read the
+    cached results.
+    """
+
+    def __init__(self, interval, required):
+        self.interval = interval
+        self.required = required
+        self.results = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="health-probe")
+        self._running = {}
+        self.stats = {"probes": 0, "probe_failures": 0, "shared_results": 0}
+
+    def start(self):
+        """Start the probe thread; probing is off when the interval is 0"""
+        with self._lock:
+            if self._thread is None and self.interval > 0:
+                self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Backend health probes failed: {e}")
+            time.sleep(self.interval)
+
+    def probe_if_idle(self, timeout):
+        """Probe now when no background thread keeps the results current (stdio has none).
+
+        Waits at most `timeout` seconds; a backend that hasn't answered by then is reported down.
+        """
+        if self._thread is None and self.interval > 0:
+            self.refresh(min(timeout, HEALTH_PROBE_TIMEOUT_SECONDS))
+
+    @staticmethod
+    def _probe_github():
+        # Through the owner's client, so the probe goes through github_scheduler and the circuit breaker like any call
+        rate_limit = SessionBound.defaults["github"].get_rate_limit()
+        return {"rate_limit_remaining": rate_limit.core.remaining}
+
+    @staticmethod
+    def _probe_drive():
+        SessionBound.defaults["drive"].about().get(fields="user(emailAddress)").execute()
+        return {}
+
+    @staticmethod
+    def _probe_gemini():
+        genai.get_model(gemini_model.model_name, request_options={"timeout": HEALTH_PROBE_TIMEOUT_SECONDS})
+        return {}
+
+    def _probes(self):
+        probes = {}
+        if SessionBound.defaults["github"] is not None:
+            probes["github"] = self._probe_github
+        if SessionBound.defaults["drive"] is not None:
+            probes["drive"] = self._probe_drive
+        if gemini_model is not None:
+            probes["gemini"] = self._probe_gemini
+        return probes
+
+    @staticmethod
+    def _timed(probe):
+        started = time.monotonic()
+        try:
+            result = {"status": "up", **probe()}
+        except Exception as e:
+            result = {"status": "down", "error": f"{e.__class__.__name__}: {e}"[:200]}
+        result["latency_ms"] = round((time.monotonic() - started) * 1000)
+        result["checked_at"] = time.time()
+        return result
+
+    def refresh(self, timeout=HEALTH_PROBE_TIMEOUT_SECONDS):
+        """Probe every configured backend whose shared result has expired, all in parallel, waiting up to `timeout`"""
+        pending = {}
+        for name, probe in self._probes().items():
+            cached = shared_cache.get("health", name)
+            if cached is not None:
+                with self._lock:
+                    self.results[name] = cached
+                    self.stats["shared_results"] += 1
+            else:
+                # A probe that is still hanging from an earlier round is waited on again, never stacked
+                running = self._running.get(name)
+                # ...and one that finished after an earlier, shorter wait gave up on it is still fresh
+                fresh = running is not None and running.done() and time.time() - running.result()["checked_at"] < self.interval
+                if not fresh and (running is None or running.done()):
+                    running = self._running[name] = self._executor.submit(self._timed, probe)
+                pending[name] = running
+        deadline = time.monotonic() + timeout
+        for name, future in pending.items():
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                shared_cache.set("health", name, result, ttl=self.interval)
+            except FutureTimeoutError:
+                result = {
+                    "status": "down", "error": f"no answer within {timeout:.1f}s",
+                    "latency_ms": None, "checked_at": time.time()
+                }
+                # Only a full-length timeout is shared; after a shorter wait the probe's own result is used once it arrives
+                if timeout >= HEALTH_PROBE_TIMEOUT_SECONDS:
+                    shared_cache.set("health", name, result, ttl=self.interval)
+            with self._lock:
+                self.results[name] = result
+                self.stats["probes"] += 1
+                if result["status"] != "up":
+                    self.stats["probe_failures"] += 1
+            if result["status"] != "up":
+                logger.warning(f"{name} health probe failed: {result['error']}")
+
+    def snapshot(self):
+        """Each backend's last probe result and overall readiness; sends no requests"""
+        now = time.time()
+        configured = {
+            "github": SessionBound.defaults["github"] is not None,
+            "gemini": gemini_model is not None,
+            "drive": SessionBound.defaults["drive"] is not None,
+            "docs": SessionBound.defaults["docs"] is not None
+        }
+        with self._lock:
+            results = {name: dict(result) for name, result in self.results.items()}
+        backends = {}
+        for name, is_configured in configured.items():
+            result = results.get("drive" if name == "docs" else name)
+            circuit = circuit_breakers[name].state
+            if not is_configured:
+                backends[name] = {"status": "not_configured"}
+                continue
+            if result is None:
+                backends[name] = {"status": "unknown", "circuit": circuit}
+                continue
+            checked_at = result.pop("checked_at")
+            age = now - checked_at
+            status = result["status"]
+            if age > 3 * max(self.interval, HEALTH_PROBE_TIMEOUT_SECONDS):
+                status = "unknown"  # The probe thread has fallen behind; don't vouch for an old result
+            elif circuit == "open":
+                status = "down"
+            backends[name] = {**result, "status": status, "circuit": circuit, "checked_seconds_ago": round(age, 1)}
+        draining = admission_control.draining
+        unavailable = [name for name in self.required if backends.get(name, {}).get("status") != "up"]
+        return {
+            "ready": not draining and not unavailable,
+            "draining": draining,
+            "required_backends": self.required,
+            "unavailable_required_backends": unavailable,
+            "backends": backends,
+            "probe_interval_seconds": self.interval,
+            **self.stats
+        }
+
+health_monitor = HealthMonitor(HEALTH_PROBE_INTERVAL_SECONDS, READINESS_REQUIRED_BACKENDS)
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health_endpoint(request):
+    """Liveness: the process is up and its event loop is answering"""
+    return JSONResponse({"status": "alive"})
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready_endpoint(request):
+    """Readiness from the cached probes: 503 while draining or when a required backend is down"""
+    readiness = health_monitor.snapshot()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+def http_app():
+    """ASGI app for uvicorn; called once in every worker process"""
+    if HTTP_WORKERS > 1:
+        # Requests of one session can land on any worker, so none may keep session state
+        mcp.settings.stateless_http = True
+    app = mcp.streamable_http_app()
+    lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def server_lifespan(app):
+        # Lifespan startup runs after uvicorn installed its signal handlers, so ours wrap them
+        graceful_shutdown.install()
+        # Fork the CPU pool while the process has no busy threads yet
+        cpu_pool.start()
+        health_monitor.start()
+        async with lifespan(app) as state:
+            yield state
+
+    app.router.lifespan_context = server_lifespan
+    return app
+
+def run_http_server(host, port, workers=1):
+    """Serve MCP over streamable HTTP: one long-lived process for many concurrent sessions.
+
+    All sessions share the module's backend clients, caches and rate limiters. With
+    several workers, each is a separate process and they share the SQLite cache.
+    """
+    logger.info(f"Serving MCP over streamable HTTP at http://{host}:{port}{mcp.settings.streamable_http_path}")
+    if workers <= 1:
+        import uvicorn
+        uvicorn.run(http_app(), host=host, port=port, log_level="info",
+                    timeout_graceful_shutdown=SHUTDOWN_CONNECTION_GRACE_SECONDS)
+        return
+    # Hand over to the uvicorn CLI so worker processes import this module once, not also as __main__
+    os.environ["MCP_WORKERS"] = str(workers)
+    logger.info(f"Starting {workers} worker processes")
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "mcp_server:http_app", "--factory",
+        "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+        "--host", host, "--port", str(port), "--workers", str(workers), "--log-level", "info",
+        "--timeout-graceful-shutdown", str(SHUTDOWN_CONNECTION_GRACE_SECONDS)
+    ])
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Google Drive, GitHub and Google Docs MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default=os.getenv("MCP_TRANSPORT", "stdio"),
+                        help="stdio for a single IDE client (default), streamable-http to serve many sessions")
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "127.0.0.1"), help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")), help="HTTP port (Render sets PORT)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_WORKERS", "1")),
+                        help="HTTP worker processes sharing one cache; 0 for one per CPU core")
+    args = parser.parse_args()
+
     logger.debug("Starting MCP server")
     try:
-        mcp.run()
+        if args.transport == "streamable-http":
+            run_http_server(args.host, args.port, resolve_workers(args.workers))
+        else:
+            graceful_shutdown.install()
+            cpu_pool.start()
+            # No /ready to serve on stdio; get_backend_health probes when it is asked
+            mcp.run()
     except Exception as e:
         logger.error(f"Server failed to start: {e}")
         raise
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Check that calls the caller gave up on leave a backend's circuit breaker as it was
+"""
+
+import sys
+import time
+
+def test_circuit_breaker():
+    """Caller-side timeouts must neither close a half-open circuit nor reset a failure streak"""
+    import mcp_server
+
+    print("🔌 Testing Circuit Breaker With Caller-Side Timeouts")
+    print("=" * 60)
+
+    passed = True
+    def check(condition, label):
+        nonlocal passed
+        passed = passed and condition
+        print(f"{'✅' if condition else '❌'} {label}")
+
+    def failing():
+        raise ConnectionError("connection refused")
+
+    def caller_gave_up():
+        raise mcp_server.DeadlineExceeded("deadline exceeded while waiting on a backend call")
+
+    def caller_timeout():
+        raise TimeoutError("read timed out")
+
+    def ok():
+        return "ok"
+
+    def call(breaker, fn, **kwargs):
+        try:
+            breaker.call(fn, **kwargs)
+        except Exception:
+            pass
+
+    # Open the circuit, let it go half-open, then the probe runs out of the caller's time
+    breaker = mcp_server.CircuitBreaker("test", 10.0, lambda e: isinstance(e, (ConnectionError, TimeoutError)),
+                                        failure_threshold=3, open_seconds=0.2)
+    for _ in range(3):
+        call(breaker, failing)
+    check(breaker.state == "open", "Three failures open the circuit")
+    time.sleep(0.25)
+    call(breaker, caller_gave_up)
+    check(breaker.state == "half_open", "Probe that hit the caller's deadline leaves the circuit half-open")
+    check(breaker.consecutive_failures == 3, "Probe that hit the caller's deadline leaves the failure count")
+    call(breaker, caller_timeout, budget_seconds=1.0)
+    check(breaker.state == "half_open", "Probe timing out under a 1s caller budget leaves the circuit half-open")
+    call(breaker, ok)
+    check(breaker.state == "closed", "Next probe is let through and closes the circuit when it succeeds")
+
+    # In the closed state a caller timeout must not hide a failure streak
+    breaker = mcp_server.CircuitBreaker("test", 10.0, lambda e: isinstance(e, (ConnectionError, TimeoutError)),
+                                        failure_threshold=3, open_seconds=0.2)
+    call(breaker, failing)
+    call(breaker, failing)
+    call(breaker, caller_gave_up)
+    check(breaker.consecutive_failures == 2, "Caller timeout keeps the failure streak")
+    call(breaker, failing)
+    check(breaker.state == "open", "The streak's third failure still opens the circuit")
+
+    print("\n" + "=" * 60)
+    print("🎉 All circuit breaker checks passed" if passed else "❌ Some circuit breaker checks failed")
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if test_circuit_breaker() else 1)
@@ -812,6 +812,66 @@ async def analyze_and_add_to_resume(session):
     except Exception as e:
         print(f"❌ Error in analysis workflow: {e}")
 
+async def batch_add_repos_to_resume(session):
+    """Server-side workflow: analyze several repositories and add them all to a resume in one call"""
+    
+    print("\n🎯 Batch Repository Analysis + Resume Update")
+    print("=" * 50)
+    
+    repos_input = input("Enter repository names (owner/repo, comma-separated): ").strip()
+    repo_names = [name.strip() for name in repos_input.split(',') if name.strip()]
+    if not repo_names or not all('/' in name for name in repo_names):
+        print("❌ Please enter repositories in format 'owner/repo'")
+        return
+    
+    doc_id = input("Enter Google Docs document ID of your resume: ").strip()
+    if not doc_id:
+        print("❌ Document ID is required")
+        return
+    
+    print("\n🎯 Resume Focus:")
+    print("1. Technical skills & technologies")
+    print("2. Leadership & collaboration")
+    print("3. Impact & achievements")
+    print("4. Learning & growth")
+    
+    focus_choice = input("Select resume focus (1-4, default: 1): ").strip()
+    focus_types = {"1": "technical", "2": "leadership", "3": "impact", "4": "learning"}
+    focus_area = focus_types.get(focus_choice, "technical")
+    
+    print(f"\n🔍 Analyzing {len(repo_names)} repositories and updating your resume...")
+    
+    try:
+        result = await session.call_tool("add_repos_to_resume", {
+            "repo_names": repo_names,
+            "doc_id": doc_id,
+            "focus_area": focus_area
+        })
+        
+        for content in result.content:
+            if hasattr(content, 'text'):
+                try:
+                    data = json.loads(content.text)
+                    if data.get("success"):
+                        doc_info = data.get("document_info", {})
+                        print(f"🎉 {data.get('message')}")
+                        print(f"🌐 Link: {doc_info.get('web_view_link')}")
+                    elif "error" in data:
+                        print(f"❌ Error: {data['error']}")
+                    for repo in data.get("repositories", []):
+                        if repo.get("status") == "added":
+                            print(f"\n✅ {repo['repo_name']}")
+                            for point in repo.get("bullet_points", []):
+                                print(f"   • {point}")
+                        else:
+                            print(f"\n❌ {repo['repo_name']}: {repo.get('error', repo.get('status'))}")
+                    break
+                except json.JSONDecodeError:
+                    continue
+    
+    except Exception as e:
+        print(f"❌ Error in batch resume workflow: {e}")
+
 async def create_resume_summary_for_repo(session, repo_name):
     """Create resume summary for a specific repository from the exploration interface"""
     
@@ -1534,9 +1594,10 @@ async def main_menu():
                     print("9. 📝 Generate README for notebook")
                     print("10. 📄 Manage Google Docs")
                     print("11. 🏓 Test server ping")
-                    print("12. ❌ Exit")
+                    print("12. 🎯 Analyze several repos + Add to resume")
+                    print("13. ❌ Exit")
                     
-                    choice = input("\nSelect an option (1-12): ").strip()
+                    choice = input("\nSelect an option (1-13): ").strip()
                     
                     if choice == "1":
                         await interactive_github_uploader(session)
@@ -1643,10 +1704,12 @@ async def main_menu():
                         except Exception as e:
                             print(f"❌ Ping failed: {e}")
                     elif choice == "12":
+                        await batch_add_repos_to_resume(session)
+                    elif choice == "13":
                         print("👋 Goodbye!")
                         return
                     else:
-                        print("❌ Invalid choice. Please select 1-12.")
+                        print("❌ Invalid choice. Please select 1-13.")
                     
                     input("\nPress Enter to continue...")
                     
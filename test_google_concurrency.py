@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Stress test: many concurrent tool calls issuing Google Drive/Docs requests in parallel
+"""
+
+import asyncio
+import json
+import time
+from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+from mcp.client.session import ClientSession
+
+SEARCH_TERMS = ["resume", "report", "notes", "project", "", "analysis", "draft", "plan"]
+
+async def call_json(session, tool, arguments):
+    """Call a tool and return its decoded JSON result"""
+    result = await session.call_tool(tool, arguments)
+    for content in result.content:
+        if hasattr(content, 'text'):
+            return json.loads(content.text)
+    return {}
+
+async def test_google_concurrency(concurrency=32, rounds=3):
+    """Fire `concurrency` Drive listings at once, `rounds` times, and check every one succeeds"""
+
+    print(f"🧵 Stress Testing Parallel Google API Calls ({concurrency} concurrent, {rounds} rounds)")
+    print("=" * 60)
+
+    server_params = StdioServerParameters(
+        command="python",
+        args=["mcp_server.py"]
+    )
+
+    try:
+        async with stdio_client(server_params) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+
+                # The sequential answer for each search term is what every concurrent call must match
+                expected = {}
+                for term in SEARCH_TERMS:
+                    result = await call_json(session, "list_google_docs", {"search_term": term})
+                    if "error" in result:
+                        print(f"❌ list_google_docs failed: {result['error']}")
+                        return
+                    expected[term] = sorted(doc["id"] for doc in result.get("documents", []))
+
+                started = time.monotonic()
+                await call_json(session, "list_google_docs", {"search_term": "resume"})
+                sequential_seconds = time.monotonic() - started
+                print(f"📄 Single call: {sequential_seconds * 1000:.0f} ms")
+
+                failures = 0
+                mismatches = 0
+                total_seconds = 0.0
+                for round_number in range(1, rounds + 1):
+                    terms = [SEARCH_TERMS[i % len(SEARCH_TERMS)] for i in range(concurrency)]
+                    started = time.monotonic()
+                    results = await asyncio.gather(*(
+                        call_json(session, "list_google_docs", {"search_term": term}) for term in terms
+                    ), return_exceptions=True)
+                    elapsed = time.monotonic() - started
+                    total_seconds += elapsed
+
+                    for term, result in zip(terms, results):
+                        if isinstance(result, Exception) or "error" in result:
+                            failures += 1
+                        elif sorted(doc["id"] for doc in result.get("documents", [])) != expected[term]:
+                            mismatches += 1
+                    print(f"🔁 Round {round_number}: {concurrency} calls in {elapsed:.2f}s")
+
+                total_calls = concurrency * rounds
+                print("\n" + "=" * 60)
+                print(f"⚡ Throughput: {total_calls / total_seconds:.1f} calls/s "
+                      f"({sequential_seconds * total_calls / total_seconds:.1f}x a single call's rate)")
+                print(f"{'✅' if not failures else '❌'} Failed calls: {failures}")
+                print(f"{'✅' if not mismatches else '❌'} Responses crossed between calls: {mismatches}")
+
+                stats = await call_json(session, "get_server_stats", {})
+                for pool in stats.get("google_http", []):
+                    print(f"🔌 HTTP transports: {pool['created']} created, {pool['reused']} reused, "
+                          f"peak {pool['peak_in_use']} in use")
+
+    except Exception as e:
+        print(f"❌ Client error: {e}")
+
+if __name__ == "__main__":
+    print("⚠️  Make sure you have:")
+    print("  1. Google credentials configured (token.json)")
+    print("  2. Some Google Docs in your Drive")
+    print()
+    asyncio.run(test_google_concurrency())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Send SIGTERM to the HTTP server during a long tool call and check that it drains instead of dropping the call
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.client.session import ClientSession
+
+def free_port():
+    """Pick an unused local TCP port for the server"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def test_graceful_shutdown(repo_name="microsoft/vscode", drain_seconds=5, signal_after=2.0):
+    """Start a long read_github_repo_files call, send SIGTERM, and follow the server until it exits"""
+
+    print(f"🧘 Testing Graceful Shutdown ({drain_seconds}s drain deadline)")
+    print("=" * 60)
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    # The server logs at DEBUG; a file keeps a full pipe from blocking it
+    log = tempfile.TemporaryFile(mode="w+")
+    server = subprocess.Popen(
+        [sys.executable, "mcp_server.py", "--transport", "streamable-http", "--port", str(port)],
+        env={**os.environ, "SHUTDOWN_DRAIN_SECONDS": str(drain_seconds)},
+        stdout=subprocess.DEVNULL, stderr=log
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                async with streamablehttp_client(url) as (read_stream, write_stream, _):
+                    async with ClientSession(read_stream, write_stream) as session:
+                        await session.initialize()
+
+                        call_task = asyncio.create_task(session.call_tool("read_github_repo_files", {
+                            "repo_name": repo_name,
+                            "max_files": 500
+                        }))
+                        await asyncio.sleep(signal_after)
+                        if call_task.done():
+                            print("⚠️  Tool finished before the signal; try a larger repository")
+                            return
+
+                        server.send_signal(signal.SIGTERM)
+                        signalled_at = time.monotonic()
+                        print(f"📨 SIGTERM sent {signal_after}s into the call")
+                        await asyncio.sleep(0.5)
+
+                        result = await session.call_tool("list_colab_files", {})
+                        rejected = not result.isError and '"busy": true' in result.content[0].text
+                        print(f"{'✅' if rejected else '❌'} New call during the drain turned away: {rejected}")
+
+                        result = await call_task
+                        text = result.content[0].text if result.content else ""
+                        outcome = "aborted" if "shutting down" in text else "finished"
+                        print(f"✅ In-flight call answered ({outcome}) {time.monotonic() - signalled_at:.1f}s after SIGTERM")
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    print("❌ Server did not start")
+                    return
+                await asyncio.sleep(0.5)
+
+        try:
+            server.wait(timeout=drain_seconds + 30)
+        except subprocess.TimeoutExpired:
+            print("❌ Server still running long after the drain deadline")
+            return
+        print(f"✅ Server exited {time.monotonic() - signalled_at:.1f}s after SIGTERM")
+        log.seek(0)
+        for line in log:
+            if "Shutdown report" in line:
+                print(f"📋 {line.split('Shutdown report: ', 1)[1].strip()}")
+    finally:
+        if server.poll() is None:
+            server.kill()
+        log.close()
+
+if __name__ == "__main__":
+    print("⚠️  Make sure you have:")
+    print("  1. GITHUB_TOKEN configured in .env")
+    print("  2. A large repository to traverse (default: microsoft/vscode)")
+    print()
+    asyncio.run(test_graceful_shutdown(sys.argv[1] if len(sys.argv) > 1 else "microsoft/vscode"))
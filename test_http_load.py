@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Load test for the streamable HTTP mode: many concurrent MCP sessions against one server process
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.client.session import ClientSession
+
+def free_port():
+    """Pick an unused local TCP port for the server"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_rss_mb(pid):
+    """Resident memory of the server process in MB (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+async def wait_for_server(port, timeout=30):
+    """Wait until the server accepts TCP connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+class LoadSession:
+    """One client session that stays open for the whole test, driven through events"""
+
+    def __init__(self, url, calls):
+        self.url = url
+        self.calls = calls
+        self.opened = asyncio.Event()
+        self.start_calls = asyncio.Event()
+        self.close = asyncio.Event()
+        self.init_seconds = None
+        self.latencies = []
+
+    async def run(self):
+        # Each session enters and leaves its transport in its own task
+        started = time.monotonic()
+        async with streamablehttp_client(self.url) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                self.init_seconds = time.monotonic() - started
+                self.opened.set()
+
+                await self.start_calls.wait()
+                for _ in range(self.calls):
+                    call_started = time.monotonic()
+                    await session.call_tool("ping", {})
+                    self.latencies.append(time.monotonic() - call_started)
+                await self.close.wait()
+
+async def test_http_load(sessions=50, calls_per_session=20):
+    """Open many sessions on one streamable HTTP server and measure overhead and throughput"""
+
+    print(f"🌐 Testing Streamable HTTP with {sessions} Concurrent Sessions")
+    print("=" * 60)
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    server = subprocess.Popen(
+        [sys.executable, "mcp_server.py", "--transport", "streamable-http", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    try:
+        if not await wait_for_server(port):
+            print("❌ Server did not start listening")
+            return
+        print(f"✅ Server listening on {url} (pid {server.pid})")
+
+        async with streamablehttp_client(url) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as control:
+                # Warm up the process with one session so the baseline excludes one-off imports and caches
+                await control.initialize()
+                await control.call_tool("ping", {})
+                rss_before = server_rss_mb(server.pid)
+
+                clients = [LoadSession(url, calls_per_session) for _ in range(sessions)]
+                tasks = [asyncio.create_task(client.run()) for client in clients]
+
+                started = time.monotonic()
+                await asyncio.gather(*(client.opened.wait() for client in clients))
+                open_seconds = time.monotonic() - started
+                init_times = [client.init_seconds for client in clients]
+                rss_after = server_rss_mb(server.pid)
+
+                print(f"\n📂 Opened {sessions} sessions in {open_seconds:.2f}s")
+                print(f"   initialize latency: median {statistics.median(init_times) * 1000:.0f} ms, "
+                      f"p95 {percentile(init_times, 95) * 1000:.0f} ms")
+                if rss_before is not None and rss_after is not None:
+                    print(f"   server memory: {rss_before:.1f} MB -> {rss_after:.1f} MB "
+                          f"({(rss_after - rss_before) / sessions * 1024:.0f} KB per session)")
+
+                started = time.monotonic()
+                for client in clients:
+                    client.start_calls.set()
+                while sum(len(client.latencies) for client in clients) < sessions * calls_per_session:
+                    await asyncio.sleep(0.01)
+                elapsed = time.monotonic() - started
+                latencies = [latency for client in clients for latency in client.latencies]
+
+                print(f"\n⚡ {len(latencies)} tool calls across {sessions} sessions in {elapsed:.2f}s")
+                print(f"   throughput: {len(latencies) / elapsed:.0f} calls/s")
+                print(f"   call latency: median {statistics.median(latencies) * 1000:.1f} ms, "
+                      f"p95 {percentile(latencies, 95) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+
+                for client in clients:
+                    client.close.set()
+                await asyncio.gather(*tasks)
+
+                # Every session was served by one process sharing its backend clients and caches
+                result = await control.call_tool("get_server_stats", {})
+                print(f"\n📊 Server still responsive after the load: {not result.isError}")
+
+    except Exception as e:
+        print(f"❌ Client error: {e}")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    asyncio.run(test_http_load(sessions))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark parsing several large notebooks at once, in-process versus in the CPU worker pool
+"""
+
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def make_notebook(megabytes, seed):
+    """A synthetic .ipynb of about `megabytes` MB: code cells with plotted image outputs, like a real analysis"""
+    rng = random.Random(seed)
+    cells = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        source = [f"result_{len(cells)} = model.fit(x_{rng.randint(0, 99)}, epochs={rng.randint(1, 50)})\n" for _ in range(20)]
+        image = base64.b64encode(rng.randbytes(48 * 1024)).decode()
+        cells.append({"cell_type": "markdown", "metadata": {}, "source": [f"## Step {len(cells)}\n", "Training notes\n"]})
+        cells.append({
+            "cell_type": "code", "metadata": {}, "execution_count": len(cells), "source": source,
+            "outputs": [{"output_type": "display_data", "data": {"image/png": image, "text/plain": ["<Figure>"]}, "metadata": {}}]
+        })
+        size += len(image) + sum(len(line) for line in source)
+    notebook = {"metadata": {"colab": {"name": f"notebook_{seed}.ipynb"}}, "nbformat": 4, "nbformat_minor": 0, "cells": cells}
+    return json.dumps(notebook, indent=1).encode("utf-8")
+
+def process_notebook(pool, raw):
+    """What read_colab_notebook and the MCP wrapper do with a downloaded notebook: parse it, then encode the result"""
+    parsed = pool.parse_notebook(raw)
+    encoded = pool.encode_result(parsed)
+    return parsed, encoded if isinstance(encoded, str) else json.dumps(encoded, indent=2, ensure_ascii=False)
+
+async def measure_loop_lag(stop, lags, interval=0.005):
+    """How late the event loop wakes up from short sleeps while the notebooks are processed"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - started - interval)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+async def run_mode(label, pool, notebooks, rounds):
+    """Process all notebooks concurrently `rounds` times; returns the parsed results"""
+    loop = asyncio.get_running_loop()
+    threads = ThreadPoolExecutor(max_workers=len(notebooks))
+    stop = asyncio.Event()
+    lags = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+    started = time.monotonic()
+    for _ in range(rounds):
+        results = await asyncio.gather(*(loop.run_in_executor(threads, process_notebook, pool, raw) for raw in notebooks))
+    elapsed = time.monotonic() - started
+    stop.set()
+    await lag_task
+    threads.shutdown()
+
+    processed = len(notebooks) * rounds
+    megabytes = sum(len(raw) for raw in notebooks) * rounds / 1024 / 1024
+    print(f"{label}: {processed / elapsed:6.1f} notebooks/s ({megabytes / elapsed:6.1f} MB/s), "
+          f"event loop lag p50 {percentile(lags, 0.5) * 1000:5.1f} ms, p99 {percentile(lags, 0.99) * 1000:6.1f} ms, "
+          f"max {max(lags, default=0) * 1000:6.1f} ms")
+    return results
+
+async def test_notebook_offload(notebook_count=8, megabytes=8, rounds=3):
+    """Compare throughput and event loop responsiveness with and without the CPU pool"""
+    import mcp_server
+
+    workers = mcp_server.CPU_POOL_WORKERS or min(4, os.cpu_count() or 1)
+    print(f"🧮 Processing {notebook_count} notebooks of ~{megabytes} MB at once, {rounds} rounds ({workers} pool workers)")
+    print("=" * 60)
+
+    notebooks = [make_notebook(megabytes, seed) for seed in range(notebook_count)]
+    inline = mcp_server.CpuPool(0, mcp_server.CPU_OFFLOAD_MIN_BYTES)
+    offloaded = mcp_server.CpuPool(workers, mcp_server.CPU_OFFLOAD_MIN_BYTES)
+    if not offloaded.start():
+        print("❌ Worker processes need the fork start method, which this platform lacks")
+        return
+
+    try:
+        inline_results = await run_mode("🐢 In-process ", inline, notebooks, rounds)
+        pool_results = await run_mode("🚀 Process pool", offloaded, notebooks, rounds)
+    finally:
+        offloaded.shutdown()
+
+    print("\n" + "=" * 60)
+    same = [parsed for parsed, _ in inline_results] == [parsed for parsed, _ in pool_results]
+    print(f"{'✅' if same else '❌'} Parsed notebooks identical in both modes")
+    stats = offloaded.snapshot()
+    print(f"📦 {stats['offloaded']} stages offloaded, {stats['bytes_shared'] / 1024 / 1024:.0f} MB passed through shared memory, "
+          f"{stats['pool_failures']} pool failures")
+
+if __name__ == "__main__":
+    notebook_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    megabytes = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"🖥️  {os.cpu_count()} CPU cores available")
+    asyncio.run(test_notebook_offload(notebook_count, megabytes))
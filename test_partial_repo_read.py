@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Check that read_github_repo_files reports backend failures during the directory walk and never caches a partial read
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+class FakeContent:
+    """A GitHub file or directory entry; reading `decoded_content` may raise the injected error"""
+
+    def __init__(self, path, kind, error=None):
+        self.path = path
+        self.name = path.rsplit("/", 1)[-1]
+        self.type = kind
+        self.size = 12
+        self.html_url = f"https://github.com/octo/demo/blob/main/{path}"
+        self.download_url = None
+        self.error = error
+
+    @property
+    def decoded_content(self):
+        if self.error is not None:
+            raise self.error
+        return f"# {self.path}\n".encode()
+
+class FakeRepo:
+    """A public repository whose listing of `failing_path` raises `error`"""
+
+    name = "demo"
+    full_name = "octo/demo"
+    description = "Partial read test"
+    html_url = "https://github.com/octo/demo"
+    language = "Python"
+    stargazers_count = 0
+    forks_count = 0
+    default_branch = "main"
+    private = False
+
+    def __init__(self, failing_path=None, error=None, file_error=None):
+        self.pushed_at = datetime.now()
+        self.failing_path = failing_path
+        self.error = error
+        self.tree = {
+            "": [FakeContent("README.md", "file"), FakeContent("src", "dir"), FakeContent("docs", "dir")],
+            "src": [FakeContent("src/app.py", "file", file_error), FakeContent("src/util.py", "file")],
+            "docs": [FakeContent("docs/guide.md", "file")]
+        }
+
+    def get_contents(self, path):
+        if path == self.failing_path:
+            raise self.error
+        return self.tree[path]
+
+def read(mcp_server, repo, writes):
+    """Run the tool against `repo`; returns the result and how many entries it wrote to the repo cache"""
+    mcp_server.get_repo_for_read = lambda repo_name: repo
+    before = len(writes)
+    result = mcp_server.read_github_repo_files("octo/demo", "py,md", 50)
+    return result, len(writes) - before
+
+def test_partial_repo_read():
+    """A failure partway through the walk is reported and keeps the read out of the shared cache"""
+    os.environ["SHARED_CACHE_FILE"] = os.path.join(tempfile.mkdtemp(), "shared_cache.sqlite3")
+    import mcp_server
+
+    print("🧩 Testing Repository Reads With Backend Failures")
+    print("=" * 60)
+
+    # Stand-in for a configured GitHub client; the fake repository is handed out by get_repo_for_read
+    mcp_server.SessionBound.defaults["github"] = object()
+    writes = []
+    original_set = mcp_server.shared_cache.set
+    def counting_set(namespace, key, value, **kwargs):
+        if namespace == "repo":
+            writes.append(key)
+        return original_set(namespace, key, value, **kwargs)
+    mcp_server.shared_cache.set = counting_set
+
+    passed = True
+    def check(condition, label):
+        nonlocal passed
+        passed = passed and condition
+        print(f"{'✅' if condition else '❌'} {label}")
+
+    unavailable = mcp_server.BackendUnavailable("github circuit is open", retry_after=30)
+    result, cached = read(mcp_server, FakeRepo("src", unavailable), writes)
+    summary = result.get("summary", {})
+    check(summary.get("partial") is True, "Directory failure marks the read partial")
+    check([failure["path"] for failure in summary.get("failed_paths", [])] == ["src"], "Failed directory is reported")
+    check(summary.get("total_files_found") == 2, "Files from the other directories are still returned")
+    check(cached == 0, "Partial read is not cached")
+
+    result, cached = read(mcp_server, FakeRepo(file_error=ConnectionError("connection reset")), writes)
+    summary = result.get("summary", {})
+    check(summary.get("partial") is True and [f["path"] for f in summary.get("failed_files", [])] == ["src/app.py"],
+          "File failure is reported and marks the read partial")
+    check(cached == 0, "Read with a failed file is not cached")
+
+    result, cached = read(mcp_server, FakeRepo("docs", mcp_server.DeadlineExceeded("deadline exceeded")), writes)
+    check("error" in result and "deadline" in result["error"], "Deadline during the walk ends the read instead of skipping the path")
+    check(cached == 0, "Read that ran out of time is not cached")
+
+    result, cached = read(mcp_server, FakeRepo(), writes)
+    summary = result.get("summary", {})
+    check(summary.get("partial") is False and summary.get("total_files_found") == 4, "Complete read has every file")
+    check(cached == 1, "Complete read is cached")
+
+    print("\n" + "=" * 60)
+    print("🎉 All partial read checks passed" if passed else "❌ Some partial read checks failed")
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if test_partial_repo_read() else 1)
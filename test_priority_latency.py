@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Measure interactive tool latency while a bulk batch analysis keeps the server busy
+"""
+
+import asyncio
+import json
+import sys
+import time
+from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+from mcp.client.session import ClientSession
+
+INTERACTIVE_CALLS = [("ping", {}), ("list_colab_files", {"max_results": 5}), ("list_google_docs", {"search_term": "resume"})]
+
+async def sample_latencies(session, rounds):
+    """Call each interactive tool `rounds` times; returns {tool: [seconds, ...]}"""
+    latencies = {tool: [] for tool, _ in INTERACTIVE_CALLS}
+    for _ in range(rounds):
+        for tool, arguments in INTERACTIVE_CALLS:
+            started = time.monotonic()
+            await session.call_tool(tool, arguments)
+            latencies[tool].append(time.monotonic() - started)
+        await asyncio.sleep(0.1)
+    return latencies
+
+def report(label, latencies):
+    for tool, samples in latencies.items():
+        samples = sorted(samples)
+        p50 = samples[len(samples) // 2] * 1000
+        p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1000
+        print(f"⏱️  {label:<10} {tool:<18} p50 {p50:7.0f} ms   p99 {p99:7.0f} ms")
+
+async def test_priority_latency(repo_names, rounds=20):
+    """Compare interactive latency on an idle server with latency during analyze_github_repos_batch"""
+
+    print(f"🚦 Testing Interactive Latency Under Bulk Load ({len(repo_names)} repositories)")
+    print("=" * 60)
+
+    server_params = StdioServerParameters(
+        command="python",
+        args=["mcp_server.py"]
+    )
+
+    try:
+        async with stdio_client(server_params) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+
+                # Warm up caches and connections so both measurements start equal
+                await sample_latencies(session, 1)
+                report("idle", await sample_latencies(session, rounds))
+
+                bulk = asyncio.create_task(session.call_tool("analyze_github_repos_batch", {
+                    "repo_names": repo_names,
+                    "max_concurrency": 10
+                }))
+                await asyncio.sleep(3)
+                if bulk.done():
+                    print("⚠️  Batch finished before the measurement; pass more repositories")
+                    return
+                report("loaded", await sample_latencies(session, rounds))
+                await bulk
+
+                result = await session.call_tool("get_server_stats", {})
+                scheduling = json.loads(result.content[0].text)["scheduling"]
+                for pool, data in scheduling.items():
+                    for priority, stats in data["classes"].items():
+                        if stats["granted"]:
+                            print(f"🧮 {pool:<12} {priority:<11} granted {stats['granted']:>5}, "
+                                  f"waited {stats['waited']:>5}, wait p99 {stats['wait_ms_p99']} ms")
+
+    except Exception as e:
+        print(f"❌ Client error: {e}")
+
+if __name__ == "__main__":
+    print("⚠️  Make sure you have:")
+    print("  1. GITHUB_TOKEN, GEMINI_API_KEY and Google credentials configured")
+    print("  2. A list of repositories to analyze as the background load")
+    print()
+    repos = sys.argv[1:] or [
+        "microsoft/vscode", "python/cpython", "pallets/flask", "psf/requests", "django/django",
+        "numpy/numpy", "pandas-dev/pandas", "scikit-learn/scikit-learn", "pytorch/pytorch", "tensorflow/tensorflow"
+    ]
+    asyncio.run(test_priority_latency(repos))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark throughput of the streamable HTTP server as the number of worker processes grows
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.client.session import ClientSession
+
+def free_port():
+    """Pick an unused local TCP port for the server"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_until_serving(url, timeout=60):
+    """Wait until a worker answers an MCP handshake"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with streamablehttp_client(url) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    return True
+        except Exception:
+            await asyncio.sleep(0.5)
+    return False
+
+async def run_client(url, tool, arguments, stop_at, counts):
+    """Call `tool` back to back on one session until `stop_at`"""
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            while time.monotonic() < stop_at:
+                result = await session.call_tool(tool, arguments)
+                counts["errors" if result.isError else "calls"] += 1
+
+async def measure(workers, tool, arguments, clients, seconds):
+    """Start a server with `workers` processes and return the calls per second it sustained"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    server = subprocess.Popen(
+        [sys.executable, "mcp_server.py", "--transport", "streamable-http", "--port", str(port), "--workers", str(workers)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not await wait_until_serving(url):
+            print(f"❌ Server with {workers} workers did not start")
+            return None
+        # Give every worker time to finish starting before measuring
+        await asyncio.sleep(2)
+
+        counts = {"calls": 0, "errors": 0}
+        started = time.monotonic()
+        await asyncio.gather(*(
+            run_client(url, tool, arguments, started + seconds, counts) for _ in range(clients)
+        ))
+        elapsed = time.monotonic() - started
+        if counts["errors"]:
+            print(f"⚠️  {counts['errors']} calls returned errors")
+        return counts["calls"] / elapsed
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+async def test_worker_scaling(max_workers, tool="ping", arguments=None, clients=32, seconds=10):
+    """Measure throughput for 1, 2, 4, ... up to max_workers worker processes"""
+
+    print(f"📈 Benchmarking {tool} with 1 to {max_workers} Workers ({clients} clients, {seconds}s each)")
+    print("=" * 60)
+
+    worker_counts = []
+    workers = 1
+    while workers < max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    worker_counts.append(max_workers)
+
+    baseline = None
+    for workers in worker_counts:
+        throughput = await measure(workers, tool, arguments or {}, clients, seconds)
+        if throughput is None:
+            continue
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"👷 {workers:>3} workers: {throughput:8.1f} calls/s  "
+              f"speedup {speedup:4.2f}x  efficiency {speedup / workers * 100:3.0f}%")
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    tool = sys.argv[2] if len(sys.argv) > 2 else "ping"
+    arguments = json.loads(sys.argv[3]) if len(sys.argv) > 3 else {}
+    print(f"🖥️  {os.cpu_count()} CPU cores available")
+    asyncio.run(test_worker_scaling(max_workers, tool, arguments))